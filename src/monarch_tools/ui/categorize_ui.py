@@ -1,30 +1,161 @@
 from __future__ import annotations
 
 import curses
+import os
+import queue
+import threading
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from .taxonomy import Taxonomy, DEFAULT_CATEGORY, DEFAULT_GROUP
-from .transactions import Txn, load_transactions, write_transactions
-from .rules import load_rules, save_rules, upsert_rule_literal_description, find_rule_for_description
+from .transactions import Txn, STATUS_CONFIRMED, STATUS_INCOMPLETE, load_transactions, write_transactions
+from .rules import RulesIndex, load_rules, dump_rules, upsert_rule_literal_description, find_rule_for_description
 from .text_utils import norm_key, titleish
 
 COLUMN_CAT = 0
 COLUMN_GRP = 1
 
+_DEFAULT_CAT_KEY = norm_key(DEFAULT_CATEGORY)
+_DEFAULT_GRP_KEY = norm_key(DEFAULT_GROUP)
+
+# Static UI text, built once rather than on every redraw
+_TXN_HEADER = (
+    "Num  Statement    Transaction  Description".ljust(46)
+    + "  CatID  Category".ljust(22)
+    + "  Group"
+)
+_HELP_LINES = (
+    "0-9    cat id",
+    "Enter  approve/assign",
+    "a-z    type name",
+    "Del    clear cat/grp",
+    "Bksp   undo keystroke",
+    "q      quit",
+)
+# Transaction row layout. The template and the focus-cell offsets are both
+# derived from these (name, align, width) specs so they cannot drift apart.
+_NAME_W = 12  # Category / Group cell width
+_TXN_FIELDS = (
+    ("idx", ">", 3),
+    ("stmt", "<", 11),
+    ("txn", "<", 11),
+    ("desc", "<", 32),
+    ("cat_id", ">", 5),
+    ("cat", "<", _NAME_W),
+    ("grp", "<", _NAME_W),
+)
+_TXN_FIELD_GAP = "  "
+_TXN_CELL_FMTS = [f"{{{name}:{align}{width}}}" for name, align, width in _TXN_FIELDS]
+# split where the editable cells start: the prefix never changes for a given row
+_TXN_PREFIX_LEN = 4
+_TXN_PREFIX_FMT = "".join(f + _TXN_FIELD_GAP for f in _TXN_CELL_FMTS[:_TXN_PREFIX_LEN])
+_TXN_ROW_FMT = "{prefix}" + _TXN_FIELD_GAP.join(_TXN_CELL_FMTS[_TXN_PREFIX_LEN:])
+
+def _field_offsets() -> Dict[str, int]:
+    offsets: Dict[str, int] = {}
+    x = 0
+    for name, _, width in _TXN_FIELDS:
+        offsets[name] = x
+        x += width + len(_TXN_FIELD_GAP)
+    return offsets
+
+_TXN_OFFSETS = _field_offsets()
+_CAT_COL = _TXN_OFFSETS["cat"]
+_GRP_COL = _TXN_OFFSETS["grp"]
+
+_SAVE_BUTTON = "   [  SAVE  ]   (press S)   "
+_QUIT_PROMPT = "Quit: (S)ave & quit, (Q)uit without saving, (Esc) cancel"
+
 @dataclass
 class UIState:
     row: int = 0
     col: int = COLUMN_CAT
     scroll: int = 0
-    edit_buffer: str = ""
+    # characters typed so far in edit mode; joined only when read
+    edit_buffer: List[str] = field(default_factory=list)
     edit_mode: bool = False
     digit_buffer: str = ""
     digit_ts: float = 0.0
     message: str = ""
     message_ts: float = 0.0
+    # time.monotonic() sampled once per key; the *_ts fields are on this clock
+    now: float = 0.0
+    # last prefix completion: ((column, taxonomy version, typed key), match)
+    ghost_cache: Tuple[tuple, Optional[str]] = ((), None)
+    # last rendered ghost: ((column, taxonomy version, typed text), ghost)
+    ghost_text: Tuple[tuple, str] = ((), "")
+    # txn list index -> ((category, group, cat_id, width), rendered row) for rows near the viewport
+    line_cache: Dict[int, Tuple[tuple, str]] = field(default_factory=dict)
+    # txn list index -> rendered idx/dates/description cells (fixed for the session)
+    row_prefix: List[Optional[str]] = field(default_factory=list)
+    # rows whose status is not STATUS_CONFIRMED (see _count_status_change)
+    unconfirmed: int = 0
+    # KEY_RESIZE seen; repaint once input goes idle
+    pending_resize: bool = False
+    # ((taxonomy version, width, top_h), [(y, x, padded text, CatID or "")]) for the taxonomy panel
+    tax_layout: Tuple[tuple, List[Tuple[int, int, str, str]]] = ((), [])
+    # off-screen list window (see _txn_pad) and txn index -> signature of its pad row
+    txn_pad: Any = None
+    pad_rows: Dict[int, tuple] = field(default_factory=dict)
+    # screen region -> signature of what it currently shows (see _region_changed)
+    drawn: Dict[Any, Any] = field(default_factory=dict)
+
+@dataclass
+class _Session:
+    """Everything a key handler may need, bundled so handlers share one signature."""
+    stdscr: Any
+    taxonomy: Taxonomy
+    txns: List[Txn]
+    state: UIState
+    rules: RulesIndex
+    rules_path: Path
+    categories_path: Path
+    groups_path: Path
+    out_csv: Path
+    orig_cols: List[str]
+    meta: Dict[str, Any]
+    writer: "_AsyncWriter"
+
+class _AsyncWriter:
+    """Writes batches of (path, payload) on a daemon thread so saving never blocks the UI.
+
+    Each batch is staged next to its destinations and swapped in together;
+    close() waits for the queue to drain and re-raises any write error.
+    Batches are full snapshots, so one superseded by a newer submit() is skipped.
+    """
+
+    def __init__(self) -> None:
+        self._queue: "queue.Queue[Optional[Tuple[int, List[Tuple[Path, bytes]]]]]" = queue.Queue()
+        self._generation = 0
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="categorize-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, batch: List[Tuple[Path, bytes]]) -> None:
+        self._generation += 1
+        self._queue.put((self._generation, batch))
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            generation, batch = item
+            if generation != self._generation:
+                continue
+            try:
+                _write_batch(batch)
+            except BaseException as e:
+                if self._error is None:
+                    self._error = e
 
 def run_categorize_ui(
     stdscr,
@@ -42,81 +173,119 @@ def run_categorize_ui(
     txns, orig_cols, meta = load_transactions(in_csv)
     taxonomy = _load_taxonomy(categories_path, groups_path)
     taxonomy.normalize_display()
-    taxonomy.sort_alpha()
+    taxonomy.finalize()
+
+    taxonomy.reset_usage((t.category for t in txns), (t.group for t in txns))
 
     rules = load_rules(rules_path)
 
     # mark confirmed based on existing rules.json matches (literal description mapping)
     for t in txns:
         r = find_rule_for_description(rules, t.description)
-        if r and norm_key(str(r.get("category",""))) == norm_key(t.category) and norm_key(str(r.get("group",""))) == norm_key(t.group):
+        if r and norm_key(str(r.get("category",""))) == t.cat_key and norm_key(str(r.get("group",""))) == t.grp_key:
             t.confirmed = True
 
     state = UIState()
+    state.unconfirmed = sum(1 for t in txns if t.status != STATUS_CONFIRMED)
     out_csv = out_csv or in_csv
-
+    writer = _AsyncWriter()
+    session = _Session(stdscr, taxonomy, txns, state, rules, rules_path,
+                       categories_path, groups_path, out_csv, orig_cols, meta, writer)
+    try:
+        return _main_loop(session)
+    finally:
+        # let queued saves land before returning
+        writer.close()
+
+def _main_loop(session: _Session) -> int:
+    stdscr, taxonomy, txns, state = session.stdscr, session.taxonomy, session.txns, session.state
+    state.now = time.monotonic()
+    needs_redraw = True
     while True:
-        _maybe_expire_digit_buffer(state)
-        _draw(stdscr, taxonomy, txns, state)
+        if _maybe_expire_digit_buffer(state) or _maybe_expire_message(state):
+            needs_redraw = True
+        if needs_redraw and not state.pending_resize:
+            _draw(stdscr, taxonomy, txns, state)
+            # single batched terminal update per frame
+            curses.doupdate()
+            needs_redraw = False
         ch = stdscr.getch()
-
-        if ch == curses.KEY_RESIZE:
-            continue
-
-        if ch in (ord('q'), ord('Q')):
-            if _confirm_quit(stdscr, taxonomy, txns, state, rules_path, rules, categories_path, groups_path, out_csv, orig_cols, meta):
-                return 0
-            continue
-
-        if _handle_nav(ch, txns, state, stdscr):
+        state.now = time.monotonic()
+
+        # getch() timed out after a burst of resizes: apply the final size once
+        if ch == -1 and state.pending_resize:
+            curses.update_lines_cols()
+            state.pending_resize = False
+            stdscr.timeout(-1)
+            needs_redraw = True
             continue
 
-        # delete key: remove cat/grp from transaction + prune unused taxonomy entries
-        if ch in (curses.KEY_DC, 127) and not state.edit_mode:
-            _handle_delete(txns, taxonomy, state, categories_path, groups_path)
-            _flash(state, "Cleared. (Del)")
+        # printable/control ASCII indexes a flat table; curses KEY_* codes go through a dict
+        handler = _ASCII_KEYS[ch] if 0 <= ch < 256 else _SPECIAL_KEYS.get(ch)
+        if handler is not None:
+            rc = handler(session, ch)
+            if rc is not None:
+                return rc
+            # keys nothing handles (mouse, unbound function keys) leave the screen as is
+            needs_redraw = True
 
-            continue
-
-        # backspace: edit mode deletes characters; otherwise deletes digit buffer
-        if ch in (curses.KEY_BACKSPACE, 8, 127):
-            if state.edit_mode:
-                state.edit_buffer = state.edit_buffer[:-1]
-                if not state.edit_buffer:
-                    state.edit_mode = False
-            else:
-                state.digit_buffer = state.digit_buffer[:-1]
-                state.digit_ts = time.time()
-            continue
-
-        # digits: CatID buffer and highlight
-        if not state.edit_mode and 48 <= ch <= 57:
-            digit = chr(ch)
-            _push_digit(state, digit)
-            # if we have 3 digits, try apply cat id immediately? (we still require Enter to approve)
-            continue
+# --- key handlers: (session, ch) -> exit code, or None to keep running ---
 
-        # letters: start/continue edit
-        if 65 <= ch <= 90 or 97 <= ch <= 122 or ch == ord(' ') or ch == ord('-') or ch == ord('&'):
-            c = chr(ch)
-            if not state.edit_mode:
-                state.edit_mode = True
-                state.edit_buffer = ""
-            state.edit_buffer += c
-            continue
+def _key_quit(session: _Session, ch: int) -> Optional[int]:
+    if _confirm_quit(session):
+        return 0
+    return None
 
-        # Enter: assign/approve (ONLY Enter approves, per A)
-        if ch in (curses.KEY_ENTER, 10, 13):
-            _handle_enter(taxonomy, txns, state, rules)
-            # if all confirmed, show SAVE button and allow 's'
-            if _all_confirmed(txns):
-                _flash(state, "All confirmed — press S to SAVE.")
-            continue
+def _key_delete(session: _Session, ch: int) -> None:
+    # delete key: remove cat/grp from transaction + prune unused taxonomy entries
+    t = session.txns[session.state.row]
+    was = t.status
+    _handle_delete(session.txns, session.taxonomy, session.state, session.categories_path, session.groups_path)
+    _count_status_change(session.state, was, t.status)
+    _flash(session.state, "Cleared. (Del)")
+
+def _key_backspace(session: _Session, ch: int) -> None:
+    # backspace: edit mode deletes characters; otherwise deletes digit buffer
+    state = session.state
+    if state.edit_mode:
+        if state.edit_buffer:
+            del state.edit_buffer[-1]
+        if not state.edit_buffer:
+            state.edit_mode = False
+    else:
+        state.digit_buffer = state.digit_buffer[:-1]
+        state.digit_ts = state.now
 
-        # Save (only when all confirmed): 's' or 'S'
-        if ch in (ord('s'), ord('S')) and _all_confirmed(txns):
-            _save_all(taxonomy, txns, state, rules_path, rules, categories_path, groups_path, out_csv, orig_cols, meta)
-            return 0
+def _key_del_or_backspace(session: _Session, ch: int) -> None:
+    # 127 is Delete outside edit mode, Backspace inside it
+    if session.state.edit_mode:
+        _key_backspace(session, ch)
+    else:
+        _key_delete(session, ch)
+
+def _key_digit(session: _Session, ch: int) -> None:
+    # digits: CatID buffer and highlight (ignored while typing a name)
+    if not session.state.edit_mode:
+        _push_digit(session.state, chr(ch))
+
+def _key_text(session: _Session, ch: int) -> None:
+    # letters: start/continue edit
+    state = session.state
+    if not state.edit_mode:
+        state.edit_mode = True
+        state.edit_buffer.clear()
+    state.edit_buffer.append(chr(ch))
+
+def _key_enter(session: _Session, ch: int) -> None:
+    # Enter: assign/approve (ONLY Enter approves, per A)
+    # Enter only ever changes the focused row (it may move focus afterwards)
+    t = session.txns[session.state.row]
+    was = t.status
+    _handle_enter(session.taxonomy, session.txns, session.state, session.rules)
+    _count_status_change(session.state, was, t.status)
+    # if all confirmed, show SAVE button
+    if _all_confirmed(session.state):
+        _flash(session.state, "All confirmed — press S to SAVE.")
 
 def _init_colors():
     # pair ids
@@ -130,31 +299,39 @@ def _init_colors():
     curses.init_pair(8, curses.COLOR_MAGENTA, -1) # messages
 
 def _color_for_txn(t: Txn) -> int:
-    if t.confirmed and _is_legit(t):
-        return curses.color_pair(1)
-    if _is_legit(t):
-        return curses.color_pair(2)
-    return curses.color_pair(3)
+    # status values are the colour pair numbers set up in _init_colors
+    return curses.color_pair(t.status)
 
 def _is_legit(t: Txn) -> bool:
-    return norm_key(t.category) != norm_key(DEFAULT_CATEGORY) and norm_key(t.group) != norm_key(DEFAULT_GROUP)
+    return t.status != STATUS_INCOMPLETE
 
-def _all_confirmed(txns: List[Txn]) -> bool:
-    for t in txns:
-        if not (t.confirmed and _is_legit(t)):
-            return False
-    return True
+def _all_confirmed(state: UIState) -> bool:
+    return state.unconfirmed == 0
+
+def _count_status_change(state: UIState, before: int, after: int) -> None:
+    # keep UIState.unconfirmed in step when a row gains or loses STATUS_CONFIRMED
+    state.unconfirmed += (before == STATUS_CONFIRMED) - (after == STATUS_CONFIRMED)
 
 def _flash(state: UIState, msg: str, seconds: float = 1.2):
     state.message = msg
-    state.message_ts = time.time() + seconds
+    state.message_ts = state.now + seconds
 
-def _maybe_expire_digit_buffer(state: UIState, timeout: float = 1.2):
-    if state.digit_buffer and (time.time() - state.digit_ts) > timeout:
+def _maybe_expire_digit_buffer(state: UIState, timeout: float = 1.2) -> bool:
+    """Drop a stale CatID buffer; True if it was dropped."""
+    if state.digit_buffer and (state.now - state.digit_ts) > timeout:
         state.digit_buffer = ""
+        return True
+    return False
+
+def _maybe_expire_message(state: UIState) -> bool:
+    """Drop a flash message past its deadline; True if it was dropped."""
+    if state.message and state.now >= state.message_ts:
+        state.message = ""
+        return True
+    return False
 
 def _push_digit(state: UIState, digit: str):
-    now = time.time()
+    now = state.now
     if state.digit_buffer and (now - state.digit_ts) > 1.2:
         state.digit_buffer = ""
     if len(state.digit_buffer) >= 3:
@@ -162,33 +339,39 @@ def _push_digit(state: UIState, digit: str):
     state.digit_buffer += digit
     state.digit_ts = now
 
-def _handle_nav(ch: int, txns: List[Txn], state: UIState, stdscr) -> bool:
-    max_row = len(txns) - 1
-    if ch == curses.KEY_UP:
-        state.row = max(0, state.row - 1)
-        state.edit_mode = False
-        state.edit_buffer = ""
-        return True
-    if ch == curses.KEY_DOWN:
-        state.row = min(max_row, state.row + 1)
-        state.edit_mode = False
-        state.edit_buffer = ""
-        return True
-    if ch == curses.KEY_LEFT:
-        state.col = COLUMN_CAT
-        state.edit_mode = False
-        state.edit_buffer = ""
-        return True
-    if ch == curses.KEY_RIGHT:
-        state.col = COLUMN_GRP
-        state.edit_mode = False
-        state.edit_buffer = ""
-        return True
-    return False
+def _leave_edit(state: UIState) -> None:
+    state.edit_mode = False
+    state.edit_buffer.clear()
+
+def _key_up(session: _Session, ch: int) -> None:
+    state = session.state
+    state.row = max(0, state.row - 1)
+    _leave_edit(state)
+
+def _key_down(session: _Session, ch: int) -> None:
+    state = session.state
+    state.row = min(len(session.txns) - 1, state.row + 1)
+    _leave_edit(state)
+
+def _key_left(session: _Session, ch: int) -> None:
+    session.state.col = COLUMN_CAT
+    _leave_edit(session.state)
+
+def _key_right(session: _Session, ch: int) -> None:
+    session.state.col = COLUMN_GRP
+    _leave_edit(session.state)
+
+def _key_resize(session: _Session, ch: int) -> None:
+    # coalesce a drag's worth of resize events into one repaint once getch() idles
+    session.state.pending_resize = True
+    session.stdscr.timeout(50)
+
+def _key_dc(session: _Session, ch: int) -> None:
+    if not session.state.edit_mode:
+        _key_delete(session, ch)
 
 def _handle_enter(taxonomy: Taxonomy, txns: List[Txn], state: UIState, rules) -> None:
     t = txns[state.row]
-    cat_items = taxonomy.compute_cat_ids()
 
     # 1) digit buffer takes precedence
     if state.digit_buffer:
@@ -196,19 +379,18 @@ def _handle_enter(taxonomy: Taxonomy, txns: List[Txn], state: UIState, rules) ->
             wanted = int(state.digit_buffer)
         except ValueError:
             wanted = -1
-        match = next((x for x in cat_items if x[0] == wanted), None)
+        match = taxonomy.compute_cat_id_map().get(wanted)
         if match:
             _, cat, grp = match
             if state.col == COLUMN_CAT:
-                t.category = cat
-                t.group = grp
+                _assign(taxonomy, t, category=cat, group=grp)
                 t.confirmed = True  # Enter approves
                 upsert_rule_literal_description(rules, t.description, t.category, t.group)
                 state.row = min(len(txns)-1, state.row + 1)
             else:
                 # in Group column: treat as selecting group by category id doesn't make sense
-                t.group = grp
-                if norm_key(t.group) != norm_key(DEFAULT_GROUP) and norm_key(t.category) != norm_key(DEFAULT_CATEGORY):
+                _assign(taxonomy, t, group=grp)
+                if _is_legit(t):
                     t.confirmed = True
                     upsert_rule_literal_description(rules, t.description, t.category, t.group)
                     state.row = min(len(txns)-1, state.row + 1)
@@ -217,43 +399,40 @@ def _handle_enter(taxonomy: Taxonomy, txns: List[Txn], state: UIState, rules) ->
 
     # 2) edit buffer: autocomplete / create
     if state.edit_mode:
-        raw = state.edit_buffer.strip()
+        raw = "".join(state.edit_buffer).strip()
         state.edit_mode = False
-        state.edit_buffer = ""
+        state.edit_buffer.clear()
         if not raw:
             return
         if state.col == COLUMN_CAT:
-            cat = _autocomplete_category(taxonomy, raw)
+            cat = _autocomplete_category(taxonomy, state, raw)
             if cat is None:
                 # create new category; then move to group column
                 taxonomy.add_category(raw, DEFAULT_GROUP)  # temp group; user will set group next
-                t.category = titleish(raw)
-                t.group = ""  # blank out group per spec if cat not already in a group
+                # blank out group per spec if cat not already in a group
+                _assign(taxonomy, t, category=titleish(raw), group="")
                 t.confirmed = False
                 state.col = COLUMN_GRP
                 return
             # existing category
-            t.category = cat
-            grp_map = taxonomy.category_to_group()
-            g = grp_map.get(norm_key(cat), "")
+            g = taxonomy.grp_by_cat_key.get(norm_key(cat), "")
+            _assign(taxonomy, t, category=cat, group=g)
             if g:
-                t.group = g
                 t.confirmed = True
                 upsert_rule_literal_description(rules, t.description, t.category, t.group)
                 state.row = min(len(txns)-1, state.row + 1)
                 state.col = COLUMN_CAT
             else:
-                t.group = ""
                 state.col = COLUMN_GRP
             return
         else:
-            grp = _autocomplete_group(taxonomy, raw)
+            grp = _autocomplete_group(taxonomy, state, raw)
             if grp is None:
                 taxonomy.add_group(raw)
                 grp = titleish(raw)
-            t.group = grp
+            _assign(taxonomy, t, group=grp)
             # if category just created and isn't in any group yet, attach it now
-            if norm_key(t.category) != norm_key(DEFAULT_CATEGORY) and t.category:
+            if t.cat_key != _DEFAULT_CAT_KEY and t.category:
                 # attach category to this group if it's not in taxonomy yet
                 taxonomy.add_category(t.category, grp)
             if _is_legit(t):
@@ -270,73 +449,70 @@ def _handle_enter(taxonomy: Taxonomy, txns: List[Txn], state: UIState, rules) ->
         state.row = min(len(txns)-1, state.row + 1)
         state.col = COLUMN_CAT
 
-def _autocomplete_category(taxonomy: Taxonomy, typed: str) -> Optional[str]:
+def _cached_prefix_match(taxonomy: Taxonomy, state: UIState, col: int, typedk: str) -> Optional[str]:
+    """Prefix match for the focused column, shared between the ghost draw and Enter.
+    Recomputed only when the typed key, column or taxonomy changes.
+    """
+    key = (col, taxonomy.version, typedk)
+    if state.ghost_cache[0] == key:
+        return state.ghost_cache[1]
+    trie = taxonomy.category_trie() if col == COLUMN_CAT else taxonomy.group_trie()
+    match = trie.lookup_prefix(typedk)
+    state.ghost_cache = (key, match)
+    return match
+
+def _autocomplete_category(taxonomy: Taxonomy, state: UIState, typed: str) -> Optional[str]:
     typedk = norm_key(typed)
     if not typedk:
         return None
-    best = None
-    best_score = -1
-    for _, cat, _ in taxonomy.compute_cat_ids():
-        if norm_key(cat) == norm_key(DEFAULT_CATEGORY):
-            continue
-        ck = norm_key(cat)
-        if ck.startswith(typedk):
-            score = len(typedk)
-        elif typedk in ck:
-            score = max(0, len(typedk) - 1)
-        else:
-            score = 0
-        if score > best_score:
-            best_score = score
-            best = cat
-    # only accept if we have a real prefix match
-    if best and norm_key(best).startswith(typedk):
+    # only accept a real prefix match (an exact match sorts first among them)
+    best = _cached_prefix_match(taxonomy, state, COLUMN_CAT, typedk)
+    if best:
         return best
-    # exact case-insensitive match
-    for _, cat, _ in taxonomy.compute_cat_ids():
-        if norm_key(cat) == typedk:
-            return cat
+    # exact case-insensitive match on the reserved category
+    if typedk == _DEFAULT_CAT_KEY:
+        return DEFAULT_CATEGORY
     return None
 
-def _autocomplete_group(taxonomy: Taxonomy, typed: str) -> Optional[str]:
+def _autocomplete_group(taxonomy: Taxonomy, state: UIState, typed: str) -> Optional[str]:
     typedk = norm_key(typed)
     if not typedk:
         return None
-    for g in taxonomy.groups:
-        if norm_key(g) == typedk:
-            return g
-    # prefix match best
-    matches = [g for g in taxonomy.groups if norm_key(g).startswith(typedk)]
-    if matches:
-        matches.sort(key=lambda s: len(s))
-        return matches[0]
-    return None
+    # exact match sorts ahead of any longer prefix match
+    return _cached_prefix_match(taxonomy, state, COLUMN_GRP, typedk)
 
 def _handle_delete(txns: List[Txn], taxonomy: Taxonomy, state: UIState, categories_path: Path, groups_path: Path) -> None:
     t = txns[state.row]
     if state.col == COLUMN_CAT:
-        t.category = DEFAULT_CATEGORY
-        t.group = DEFAULT_GROUP
+        _assign(taxonomy, t, category=DEFAULT_CATEGORY, group=DEFAULT_GROUP)
         t.confirmed = False
     else:
-        t.group = ""
+        _assign(taxonomy, t, group="")
         t.confirmed = False
 
-    used_cats = [x.category for x in txns]
-    used_grps = [x.group for x in txns]
-
-    taxonomy.remove_category_if_unused(t.category, used_cats)
-    taxonomy.remove_group_if_unused(t.group, used_grps)
-
-def _confirm_quit(stdscr, taxonomy: Taxonomy, txns: List[Txn], state: UIState,
-                  rules_path: Path, rules, categories_path: Path, groups_path: Path,
-                  out_csv: Path, orig_cols, meta) -> bool:
+    # usage counts stand in for scanning every transaction's category/group
+    taxonomy.remove_category_if_unused(t.category)
+    taxonomy.remove_group_if_unused(t.group)
+
+def _assign(taxonomy: Taxonomy, t: Txn, category: Optional[str] = None, group: Optional[str] = None) -> None:
+    """Set a transaction's category and/or group, keeping taxonomy usage counts in step."""
+    taxonomy.release_usage(t.category, t.group)
+    if category is not None:
+        t.category = category
+    if group is not None:
+        t.group = group
+    taxonomy.retain_usage(t.category, t.group)
+
+def _confirm_quit(session: _Session) -> bool:
+    stdscr, state = session.stdscr, session.state
     h, w = stdscr.getmaxyx()
-    msg = "Quit: (S)ave & quit, (Q)uit without saving, (Esc) cancel"
     stdscr.attron(curses.color_pair(8))
-    stdscr.addstr(h-1, 0, msg[:w-1].ljust(w-1))
+    stdscr.addstr(h-1, 0, f"{_QUIT_PROMPT:<{w-1}.{w-1}}")
     stdscr.attroff(curses.color_pair(8))
-    stdscr.refresh()
+    # the prompt overwrote the footer; make the next frame repaint it
+    state.drawn.pop("footer", None)
+    stdscr.noutrefresh()
+    curses.doupdate()
     while True:
         ch = stdscr.getch()
         if ch in (27,):  # Esc
@@ -344,18 +520,42 @@ def _confirm_quit(stdscr, taxonomy: Taxonomy, txns: List[Txn], state: UIState,
         if ch in (ord('q'), ord('Q')):
             return True
         if ch in (ord('s'), ord('S')):
-            _save_all(taxonomy, txns, state, rules_path, rules, categories_path, groups_path, out_csv, orig_cols, meta)
+            _save_all(session)
             return True
 
-def _save_all(taxonomy: Taxonomy, txns: List[Txn], state: UIState,
-              rules_path: Path, rules, categories_path: Path, groups_path: Path,
-              out_csv: Path, orig_cols, meta) -> None:
-    # persist taxonomy
-    _save_taxonomy_files(taxonomy, categories_path, groups_path)
-    # persist rules.json (spec: use rules.json)
-    save_rules(rules_path, rules)
-    # persist updated transactions CSV
-    write_transactions(out_csv, orig_cols, meta, txns)
+def _save_all(session: _Session) -> None:
+    s = session
+    # serialize here so the writer only ever sees immutable bytes
+    groups_text, cats_text = _taxonomy_file_texts(s.taxonomy)
+    s.writer.submit([
+        (s.rules_path, dump_rules(s.rules)),
+        (s.categories_path, cats_text.encode("utf-8")),
+        (s.groups_path, groups_text.encode("utf-8")),
+    ])
+    # the transactions CSV is the user's data: write it before returning (via its own temp file)
+    write_transactions(s.out_csv, s.orig_cols, s.meta, s.txns)
+    _flash(s.state, "Saved.")
+
+def _write_batch(batch: List[Tuple[Path, bytes]]) -> None:
+    # stage each file next to its destination, then swap them all in together,
+    # so a failure part-way through leaves the previous files untouched
+    staged = [(_staging_path(p), p) for p, _ in batch]
+    try:
+        for (tmp, _), (_, payload) in zip(staged, batch):
+            with tmp.open("wb") as f:
+                f.write(payload)
+                f.flush()
+                # make sure the bytes are on disk before the rename can expose them
+                os.fsync(f.fileno())
+    except BaseException:
+        for tmp, _ in staged:
+            tmp.unlink(missing_ok=True)
+        raise
+    for tmp, dest in staged:
+        os.replace(tmp, dest)
+
+def _staging_path(path: Path) -> Path:
+    return path.with_suffix(path.suffix + ".tmp")
 
 def _load_taxonomy(categories_path: Path, groups_path: Path) -> Taxonomy:
     groups: List[str] = []
@@ -379,7 +579,7 @@ def _load_taxonomy(categories_path: Path, groups_path: Path) -> Taxonomy:
     # - Otherwise create an "Unsorted" bucket group.
     bucket = None
     for g in groups:
-        if norm_key(g) != norm_key(DEFAULT_GROUP):
+        if norm_key(g) != _DEFAULT_GRP_KEY:
             bucket = g
             break
     if bucket is None:
@@ -389,7 +589,7 @@ def _load_taxonomy(categories_path: Path, groups_path: Path) -> Taxonomy:
             group_to_cats[bucket] = []
 
     for c in cats:
-        if norm_key(c) == norm_key(DEFAULT_CATEGORY):
+        if norm_key(c) == _DEFAULT_CAT_KEY:
             continue
         group_to_cats.setdefault(bucket, []).append(c)
 
@@ -397,142 +597,139 @@ def _load_taxonomy(categories_path: Path, groups_path: Path) -> Taxonomy:
     tax.ensure_defaults()
     return tax
 
-def _save_taxonomy_files(taxonomy: Taxonomy, categories_path: Path, groups_path: Path) -> None:
-    taxonomy.sort_alpha()
+def _taxonomy_file_texts(taxonomy: Taxonomy) -> Tuple[str, str]:
+    """Return (groups.txt, categories.txt) contents."""
+    taxonomy.finalize()
     # groups.txt (one per line)
-    groups = taxonomy.groups
-    groups_path.write_text("\n".join(groups) + "\n", encoding="utf-8")
+    groups_text = "\n".join(taxonomy.groups) + "\n"
     # categories.txt: flat list (one per line) excluding Uncategorized
     cats = []
     for g in taxonomy.groups:
-        if norm_key(g) == norm_key(DEFAULT_GROUP):
+        if norm_key(g) == _DEFAULT_GRP_KEY:
             continue
         for c in taxonomy.group_to_cats.get(g, []):
-            if norm_key(c) == norm_key(DEFAULT_CATEGORY):
+            if norm_key(c) == _DEFAULT_CAT_KEY:
                 continue
             cats.append(c)
-    categories_path.write_text("\n".join(cats) + ("\n" if cats else ""), encoding="utf-8")
+    return groups_text, "\n".join(cats) + ("\n" if cats else "")
 
 def _taxonomy_lines(taxonomy: Taxonomy, col_width: int = 27, max_cols: int = 5) -> Tuple[List[List[str]], List[Tuple[int,int,int]]]:
     """Return columns of taxonomy lines and a mapping for highlighting categories by CatID.
     Returns (columns, cat_line_refs) where cat_line_refs contains tuples (cat_id, col_idx, line_idx).
     """
-    cat_items = taxonomy.compute_cat_ids()
-    # Build per-group blocks
-    blocks = []
-    cat_line_refs = []
+    by_group = taxonomy.cat_ids_by_group()
+    # one flat pass: each group header followed by its categories
+    all_lines: List[str] = []
+    cat_pos: List[Tuple[int, int]] = []  # (cat_id, index into all_lines)
     for g in taxonomy.groups:
-        # group header
-        header = f"{g}"
-        lines = [header]
-        # categories in this group
-        if norm_key(g) == norm_key(DEFAULT_GROUP):
-            cats = [DEFAULT_CATEGORY]
-        else:
-            cats = taxonomy.group_to_cats.get(g, [])
-        for cat_id, cat, grp in cat_items:
-            if norm_key(grp) != norm_key(g):
-                continue
-            if norm_key(cat) == norm_key(DEFAULT_CATEGORY) and norm_key(g) != norm_key(DEFAULT_GROUP):
-                continue
-            if norm_key(cat) == norm_key(DEFAULT_CATEGORY) and norm_key(g) == norm_key(DEFAULT_GROUP):
-                lines.append(f"  {cat_id:>2} {cat}")
-                cat_line_refs.append((cat_id, -1, -1))  # patched after layout
-            elif norm_key(cat) != norm_key(DEFAULT_CATEGORY):
-                lines.append(f"  {cat_id:>2} {cat}")
-                cat_line_refs.append((cat_id, -1, -1))
-        blocks.append(lines)
-
-    # Flow blocks into columns, never ending a column with a group name
-    columns: List[List[str]] = [[]]
-    col_idx = 0
-    line_idx = 0
-    max_lines = None  # computed by caller via screen size; we'll just pack and let caller clip
-
-    # Simple packing: append lines; let caller render top-half height clip and wrap.
-    for block in blocks:
-        # if last line in current column is group name and we would put group name at bottom, handled by render using available height
-        for ln in block:
-            columns[col_idx].append(ln)
-            # start new column if too wide? handled by max_cols and caller height, but we keep to max_cols by splitting long lists evenly
-    # Now split into up to max_cols columns by roughly equal line count
-    all_lines = []
-    for col in columns:
-        all_lines.extend(col)
+        all_lines.append(g)
+        for cat_id, cat in by_group.get(norm_key(g), ()):
+            cat_pos.append((cat_id, len(all_lines)))
+            all_lines.append(f"  {cat_id:>2} {cat}")
     if not all_lines:
         all_lines = [DEFAULT_GROUP, f"  1 {DEFAULT_CATEGORY}"]
+        cat_pos = [(1, 1)]
+
+    # split into up to max_cols columns by roughly equal line count
     per = max(1, (len(all_lines) + max_cols - 1) // max_cols)
-    columns = [all_lines[i:i+per] for i in range(0, len(all_lines), per)]
-    columns = columns[:max_cols]
-
-    # patch cat_line_refs by scanning columns
-    id_pat = __import__('re').compile(r"^\s+(\d+)\s+")
-    refs = []
-    for ci, col in enumerate(columns):
-        for li, ln in enumerate(col):
-            m = id_pat.match(ln)
-            if m:
-                refs.append((int(m.group(1)), ci, li))
+    n_cols = min(max_cols, (len(all_lines) + per - 1) // per)
+    columns = [all_lines[i*per:(i+1)*per] for i in range(n_cols)]
+    refs = [(cat_id, i // per, i % per) for cat_id, i in cat_pos]
     return columns, refs
 
+def _region_changed(state: UIState, region, sig) -> bool:
+    """Record what a screen region shows; False means it already shows exactly that."""
+    if state.drawn.get(region) == sig:
+        return False
+    state.drawn[region] = sig
+    return True
+
 def _draw(stdscr, taxonomy: Taxonomy, txns: List[Txn], state: UIState):
-    stdscr.erase()
+    """Repaint only the regions whose content changed since the previous frame."""
     h, w = stdscr.getmaxyx()
     top_h = max(3, h // 2)
     bot_h = h - top_h
+    y0 = top_h
+    # Right-side help area width
+    help_w = max(24, int(w * 0.20))
+    list_w = max(20, w - help_w - 1)
+
+    if state.drawn.get("size") != (h, w):
+        # first frame or terminal resized: start from a blank screen
+        stdscr.erase()
+        state.drawn = {"size": (h, w)}
+        _draw_static(stdscr, y0, w, h, list_w, help_w)
+
+    _draw_taxonomy(stdscr, taxonomy, state, w, top_h)
+    blit = _draw_txns(stdscr, taxonomy, txns, state, y0, w, bot_h, list_w)
+    _draw_footer(stdscr, state, w, h)
+
+    # caller flushes with curses.doupdate() once per frame; the list pad goes
+    # on top of stdscr, so it must be copied after it
+    stdscr.noutrefresh()
+    if blit is not None:
+        state.txn_pad.noutrefresh(*blit)
 
-    # Layout
-    # Top: taxonomy
+def _draw_static(stdscr, y0: int, w: int, h: int, list_w: int, help_w: int) -> None:
+    # panel headers and help text only change with the terminal size
     stdscr.attron(curses.color_pair(4))
-    stdscr.addstr(0, 0, " TAXONOMY ".ljust(w-1)[:w-1])
+    stdscr.addstr(0, 0, f"{' TAXONOMY ':<{w-1}.{w-1}}")
+    stdscr.addstr(y0, 0, f"{' TRANSACTIONS ':<{w-1}.{w-1}}")
     stdscr.attroff(curses.color_pair(4))
 
+    # Transactions table header
+    stdscr.addstr(y0+2, 0, f"{_TXN_HEADER:<{list_w}.{list_w}}", curses.color_pair(4))
+
+    # Help panel
+    hx = list_w + 1
+    stdscr.addstr(y0+2, hx, "Keys", curses.color_pair(4))
+    for i, ln in enumerate(_HELP_LINES):
+        if y0+3+i < h:
+            stdscr.addstr(y0+3+i, hx, f"{ln:<{help_w-1}.{help_w-1}}", curses.A_DIM)
+
+def _draw_taxonomy(stdscr, taxonomy: Taxonomy, state: UIState, w: int, top_h: int) -> None:
+    prev = state.drawn.get("taxonomy")
+    if not _region_changed(state, "taxonomy", (taxonomy.version, state.digit_buffer)):
+        return
+    if prev is None or prev[0] != taxonomy.version:
+        # layout may have moved; a digit-only change repaints the same cells in place
+        for y in range(1, top_h):
+            stdscr.move(y, 0)
+            stdscr.clrtoeol()
+
+    # CatID prefix from digit_buffer highlights matching categories
+    digits = state.digit_buffer
+    for y, x, txt, cid in _taxonomy_layout(taxonomy, state, w, top_h):
+        attr = curses.color_pair(5) if digits and cid.startswith(digits) else curses.color_pair(7)
+        stdscr.addstr(y, x, txt, attr)
+
+def _taxonomy_layout(taxonomy: Taxonomy, state: UIState, w: int, top_h: int) -> List[Tuple[int, int, str, str]]:
+    """Screen cells for the taxonomy panel; rebuilt only when the taxonomy or terminal size changes."""
+    key = (taxonomy.version, w, top_h)
+    if state.tax_layout[0] == key:
+        return state.tax_layout[1]
     tax_cols, cat_refs = _taxonomy_lines(taxonomy)
     col_width = 27
     max_cols = min(5, max(1, w // col_width))
     tax_cols = tax_cols[:max_cols]
+    ref_ids = {(ci, li): str(cid) for cid, ci, li in cat_refs}
 
-    # Determine highlight set from digit_buffer
-    highlight_ids = set()
-    if state.digit_buffer:
-        for cid, _, _ in cat_refs:
-            if str(cid).startswith(state.digit_buffer):
-                highlight_ids.add(cid)
-
-    # render taxonomy lines
+    cells: List[Tuple[int, int, str, str]] = []
     for ci, col in enumerate(tax_cols):
         x = ci * col_width
         for li in range(1, min(top_h, len(col)+1)):  # start at line 1 (below header)
-            txt = col[li-1][:col_width-1]
-            attr = curses.color_pair(7)
-            # highlight cat IDs prefix
-            m = __import__('re').match(r"^\s+(\d+)\s+", txt)
-            if m:
-                cid = int(m.group(1))
-                if cid in highlight_ids:
-                    attr = curses.color_pair(5)
-            stdscr.addstr(li, x, txt.ljust(col_width-1), attr)
-
-    # Bottom header
-    y0 = top_h
-    stdscr.attron(curses.color_pair(4))
-    stdscr.addstr(y0, 0, " TRANSACTIONS ".ljust(w-1)[:w-1])
-    stdscr.attroff(curses.color_pair(4))
-
-    # Right-side help area width
-    help_w = max(24, int(w * 0.20))
-    list_w = max(20, w - help_w - 1)
-
+            txt = f"{col[li-1]:<{col_width-1}.{col_width-1}}"
+            cells.append((li, x, txt, ref_ids.get((ci, li-1), "")))
+    state.tax_layout = (key, cells)
+    return cells
+
+def _draw_txns(stdscr, taxonomy: Taxonomy, txns: List[Txn], state: UIState,
+               y0: int, w: int, bot_h: int, list_w: int) -> Optional[Tuple[int, int, int, int, int, int]]:
+    """Update the inspector line and the list pad; return the pad's noutrefresh() viewport, if any."""
     # Inspector line (full description)
     inspector = txns[state.row].description if txns else ""
-    inspector = " " + inspector
-    stdscr.addstr(y0+1, 0, inspector[:w-1].ljust(w-1), curses.A_DIM)
-
-    # Transactions table header
-    header = "Num  Statement    Transaction  Description".ljust(46)
-    header += "  CatID  Category".ljust(22)
-    header += "  Group"
-    stdscr.addstr(y0+2, 0, header[:list_w].ljust(list_w), curses.color_pair(4))
+    if _region_changed(state, "inspector", inspector):
+        stdscr.addstr(y0+1, 0, f" {inspector:<{w-2}.{w-2}}", curses.A_DIM)
 
     # compute visible rows
     rows_y = y0 + 3
@@ -543,110 +740,161 @@ def _draw(stdscr, taxonomy: Taxonomy, txns: List[Txn], state: UIState):
     if state.row >= state.scroll + visible:
         state.scroll = state.row - visible + 1
 
-    cat_items = taxonomy.compute_cat_ids()
-    cat_to_id = {norm_key(cat): cid for cid, cat, grp in cat_items}
-    cat_to_group = taxonomy.category_to_group()
+    cat_to_id = taxonomy.cat_id_by_key
 
-    for i in range(visible):
-        idx = state.scroll + i
-        if idx >= len(txns):
-            break
+    width = list_w - 1
+    pad = _txn_pad(state, len(txns), width)
+    shown = min(visible, len(txns) - state.scroll)
+    for idx in range(state.scroll, state.scroll + shown):
         t = txns[idx]
-        y = rows_y + i
         color = _color_for_txn(t)
 
-        cat_id = cat_to_id.get(norm_key(t.category), 1 if norm_key(t.category)==norm_key(DEFAULT_CATEGORY) else 0)
-        desc = t.description.replace("\n", " ")
-        desc_trunc = (desc[:30] + "…") if len(desc) > 31 else desc
-
-        line = f"{t.idx:>3}  {t.statement_date:<11}  {t.transaction_date:<11}  {desc_trunc:<32}  {cat_id:>5}  {t.category:<12}  {t.group:<12}"
-        line = line[:list_w-1]
-        # focus cell highlighting
+        cat_id = cat_to_id.get(t.cat_key, 0)
+        line = _txn_line(state, idx, t, cat_id, width)
+        focus_x, ghost = -1, ""
         if idx == state.row:
-            # draw base line
-            stdscr.addstr(y, 0, line.ljust(list_w-1), color)
-            # overlay focus cell
-            # determine column spans
-            cat_start = line.find(str(cat_id).rjust(5))
-            if cat_start < 0:
-                cat_start = 0
-            # We'll highlight either Category or Group field
-            if state.col == COLUMN_CAT:
-                # category field approx after cat_id + two spaces
-                cat_field_start = cat_start + 7
-                cat_field_len = 12
-                stdscr.addstr(y, cat_field_start, line[cat_field_start:cat_field_start+cat_field_len].ljust(cat_field_len), curses.color_pair(6))
-                # show autocomplete ghost if in edit_mode
-                if state.edit_mode:
-                    ghost = _ghost_completion_category(taxonomy, state.edit_buffer)
-                    if ghost:
-                        stdscr.addstr(y, cat_field_start, ghost[:cat_field_len].ljust(cat_field_len), curses.A_DIM | curses.color_pair(6))
-            else:
-                grp_field_start = cat_start + 7 + 12 + 2
-                grp_field_len = 12
-                stdscr.addstr(y, grp_field_start, line[grp_field_start:grp_field_start+grp_field_len].ljust(grp_field_len), curses.color_pair(6))
-                if state.edit_mode:
-                    ghost = _ghost_completion_group(taxonomy, state.edit_buffer)
-                    if ghost:
-                        stdscr.addstr(y, grp_field_start, ghost[:grp_field_len].ljust(grp_field_len), curses.A_DIM | curses.color_pair(6))
-        else:
-            stdscr.addstr(y, 0, line.ljust(list_w-1), color)
+            focus_x = _CAT_COL if state.col == COLUMN_CAT else _GRP_COL
+            # show autocomplete ghost if in edit_mode
+            if state.edit_mode:
+                ghost = _ghost_text(taxonomy, state)
+        # pad rows persist across scrolling; only rewrite those whose content changed
+        sig = (line, color, focus_x, ghost)
+        if state.pad_rows.get(idx) == sig:
+            continue
+        state.pad_rows[idx] = sig
+        pad.addstr(idx, 0, line, color)
+        # focus cell: recolour the Category or Group field in place
+        field_w = min(_NAME_W, width - focus_x)
+        if focus_x >= 0 and field_w > 0:
+            pad.chgat(idx, focus_x, field_w, curses.color_pair(6))
+            if ghost:
+                pad.addstr(idx, focus_x, f"{ghost:<{field_w}.{field_w}}", curses.A_DIM | curses.color_pair(6))
+
+    _prune_line_cache(state, visible)
+    if shown <= 0:
+        return None
+    return (state.scroll, 0, rows_y, 0, rows_y + shown - 1, width - 1)
 
-    # Help panel
-    hx = list_w + 1
-    stdscr.addstr(y0+2, hx, "Keys", curses.color_pair(4))
-    help_lines = [
-        "0-9    cat id",
-        "Enter  approve/assign",
-        "a-z    type name",
-        "Del    clear cat/grp",
-        "Bksp   undo keystroke",
-        "q      quit",
-    ]
-    for i, ln in enumerate(help_lines):
-        if y0+3+i < h:
-            stdscr.addstr(y0+3+i, hx, ln[:help_w-1].ljust(help_w-1), curses.A_DIM)
+def _txn_pad(state: UIState, n_rows: int, width: int):
+    """Off-screen window holding one line per transaction; reallocated only when its shape changes."""
+    if state.txn_pad is None or state.txn_pad.getmaxyx() != (n_rows + 1, width):
+        # one spare row so writing the last row's final cell cannot fail
+        state.txn_pad = curses.newpad(n_rows + 1, width)
+        state.pad_rows = {}
+    return state.txn_pad
 
+def _draw_footer(stdscr, state: UIState, w: int, h: int) -> None:
     # Footer message / SAVE button
     footer_y = h - 1
-    if _all_confirmed(txns):
-        btn = "   [  SAVE  ]   (press S)   "
-        x = max(0, (w - len(btn)) // 2)
-        stdscr.addstr(footer_y, 0, " " * (w-1))
-        stdscr.addstr(footer_y, x, btn[:w-1], curses.A_BOLD | curses.color_pair(5))
+    if _all_confirmed(state):
+        if not _region_changed(state, "footer", _SAVE_BUTTON):
+            return
+        x = max(0, (w - len(_SAVE_BUTTON)) // 2)
+        stdscr.move(footer_y, 0)
+        stdscr.clrtoeol()
+        stdscr.addstr(footer_y, x, _SAVE_BUTTON[:w-1], curses.A_BOLD | curses.color_pair(5))
     else:
         msg = ""
-        if state.message and time.time() < state.message_ts:
+        if state.message and state.now < state.message_ts:
             msg = state.message
         elif state.digit_buffer:
             msg = f"CatID: {state.digit_buffer}"
         elif state.edit_mode:
-            msg = f"Typing: {state.edit_buffer}"
-        stdscr.addstr(footer_y, 0, msg[:w-1].ljust(w-1), curses.A_DIM)
-
-    stdscr.refresh()
+            msg = f"Typing: {''.join(state.edit_buffer)}"
+        if not _region_changed(state, "footer", msg):
+            return
+        stdscr.addstr(footer_y, 0, f"{msg:<{w-1}.{w-1}}", curses.A_DIM)
+
+def _txn_line(state: UIState, idx: int, t: Txn, cat_id: int, width: int) -> str:
+    """Rendered, width-fitted row for txns[idx]; reused until its category/group/CatID or width changes."""
+    key = (t.category, t.group, cat_id, width)
+    hit = state.line_cache.get(idx)
+    if hit is not None and hit[0] == key:
+        return hit[1]
+    line = _TXN_ROW_FMT.format(prefix=_txn_prefix(state, idx, t), cat_id=cat_id, cat=t.category, grp=t.group)
+    line = f"{line:<{width}.{width}}"
+    state.line_cache[idx] = (key, line)
+    return line
+
+def _txn_prefix(state: UIState, idx: int, t: Txn) -> str:
+    prefixes = state.row_prefix
+    if idx >= len(prefixes):
+        prefixes.extend([None] * (idx + 1 - len(prefixes)))
+    prefix = prefixes[idx]
+    if prefix is None:
+        desc = t.description.replace("\n", " ")
+        desc_trunc = (desc[:30] + "…") if len(desc) > 31 else desc
+        prefix = _TXN_PREFIX_FMT.format(idx=t.idx, stmt=t.statement_date, txn=t.transaction_date, desc=desc_trunc)
+        prefixes[idx] = prefix
+    return prefix
+
+def _prune_line_cache(state: UIState, visible: int, margin: int = 20) -> None:
+    # keep the cache bounded to the viewport plus a scroll margin
+    if len(state.line_cache) <= visible + 2 * margin:
+        return
+    lo, hi = state.scroll - margin, state.scroll + visible + margin
+    for idx in [i for i in state.line_cache if not lo <= i < hi]:
+        del state.line_cache[idx]
+
+def _ghost_text(taxonomy: Taxonomy, state: UIState) -> str:
+    """Ghost shown in the focus cell; recomputed only when the buffer, column or taxonomy changes."""
+    typed = "".join(state.edit_buffer)
+    key = (state.col, taxonomy.version, typed)
+    if state.ghost_text[0] != key:
+        if state.col == COLUMN_CAT:
+            ghost = _ghost_completion_category(taxonomy, state, typed)
+        else:
+            ghost = _ghost_completion_group(taxonomy, state, typed)
+        state.ghost_text = (key, ghost)
+    return state.ghost_text[1]
 
-def _ghost_completion_category(taxonomy: Taxonomy, typed: str) -> str:
+def _ghost_completion_category(taxonomy: Taxonomy, state: UIState, typed: str) -> str:
     typed = typed or ""
     typedk = norm_key(typed)
     if not typedk:
         return typed
     # best prefix match
-    best = None
-    for _, cat, _ in taxonomy.compute_cat_ids():
-        if norm_key(cat).startswith(typedk):
-            best = cat
-            break
+    best = _cached_prefix_match(taxonomy, state, COLUMN_CAT, typedk)
     if best:
         return titleish(best)
     return titleish(typed)
 
-def _ghost_completion_group(taxonomy: Taxonomy, typed: str) -> str:
+def _ghost_completion_group(taxonomy: Taxonomy, state: UIState, typed: str) -> str:
     typed = typed or ""
     typedk = norm_key(typed)
     if not typedk:
         return typed
-    for g in taxonomy.groups:
-        if norm_key(g).startswith(typedk):
-            return g
+    best = _cached_prefix_match(taxonomy, state, COLUMN_GRP, typedk)
+    if best:
+        return best
     return titleish(typed)
+
+def _build_ascii_keys() -> List[Optional[Callable[[_Session, int], Optional[int]]]]:
+    table: List[Optional[Callable[[_Session, int], Optional[int]]]] = [None] * 256
+    for c in range(ord('a'), ord('z') + 1):
+        table[c] = _key_text
+        table[c - 32] = _key_text
+    for c in (' ', '-', '&'):
+        table[ord(c)] = _key_text
+    for c in range(ord('0'), ord('9') + 1):
+        table[c] = _key_digit
+    table[ord('q')] = table[ord('Q')] = _key_quit
+    table[8] = _key_backspace
+    table[127] = _key_del_or_backspace
+    table[10] = table[13] = _key_enter
+    return table
+
+# ord(ch) -> handler for the common single-byte keys; built once at import
+_ASCII_KEYS = _build_ascii_keys()
+
+# curses KEY_* code -> handler for everything outside the ASCII table
+_SPECIAL_KEYS: Dict[int, Callable[[_Session, int], Optional[int]]] = {
+    curses.KEY_RESIZE: _key_resize,
+    curses.KEY_UP: _key_up,
+    curses.KEY_DOWN: _key_down,
+    curses.KEY_LEFT: _key_left,
+    curses.KEY_RIGHT: _key_right,
+    curses.KEY_DC: _key_dc,
+    curses.KEY_BACKSPACE: _key_backspace,
+    curses.KEY_ENTER: _key_enter,
+}
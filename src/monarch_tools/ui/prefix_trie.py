@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# node slot holding (key, display) of the alphabetically-first entry at or below the node;
+# "" can never collide with a single-character edge
+_FIRST = ""
+
+class PrefixTrie:
+    """Character trie over normalized keys for prefix completion.
+    Every node remembers its alphabetically-first completion, so a lookup is one
+    descent of len(prefix) steps regardless of how many entries are stored.
+    """
+
+    def __init__(self, items: Iterable[Tuple[str, str]] = ()):
+        self._root: Dict[str, Any] = {}
+        for key, display in items:
+            self.insert(key, display)
+
+    def insert(self, key: str, display: str) -> None:
+        node = self._root
+        entry = (key, display)
+        for ch in key:
+            if _FIRST not in node or key < node[_FIRST][0]:
+                node[_FIRST] = entry
+            node = node.setdefault(ch, {})
+        if _FIRST not in node or key < node[_FIRST][0]:
+            node[_FIRST] = entry
+
+    def lookup_prefix(self, prefix: str) -> Optional[str]:
+        """Return the display string of the alphabetically-first key starting with prefix."""
+        node = self._root
+        for ch in prefix:
+            node = node.get(ch)
+            if node is None:
+                return None
+        first = node.get(_FIRST)
+        return first[1] if first else None
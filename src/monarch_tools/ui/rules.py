@@ -1,40 +1,123 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+import os
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 from .text_utils import norm_key
 
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used when orjson isn't installed
+    orjson = None
+
 @dataclass
 class Rule:
     description: str
     category: str
     group: str
 
-def load_rules(path: Path) -> List[Dict[str, Any]]:
+# rules.json is either a list of {"description", "category", "group"} dicts, or the
+# {"merchants": {description: category}} / flat {description: category} shapes the
+# other commands read and write
+RulesObj = Union[List[Dict[str, Any]], Dict[str, Any]]
+
+@dataclass
+class RulesIndex:
+    """Parsed rules.json plus a norm_key(description) index over it.
+    List-shaped files index the rule dicts themselves; merchants-shaped and flat files index
+    (merchant key, value) pairs, so updates can be written back in the file's own shape.
+    """
+    rules: RulesObj
+    _by_key: Dict[str, Any] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        merchants = self._merchants()
+        if merchants is not None:
+            for k, v in merchants.items():
+                self._by_key.setdefault(norm_key(str(k)), (k, v))
+            return
+        for r in self.rules:
+            if not isinstance(r, dict):
+                continue
+            dk = norm_key(str(r.get("description","")))
+            # first rule for a description wins
+            self._by_key.setdefault(dk, r)
+
+    def _merchants(self) -> Optional[Dict[str, Any]]:
+        # read-only: same shape rules as categorize.load_rules
+        if not isinstance(self.rules, dict):
+            return None
+        merchants = self.rules.get("merchants")
+        return merchants if isinstance(merchants, dict) else self.rules
+
+    def find(self, description: str) -> Optional[Dict[str, Any]]:
+        hit = self._by_key.get(norm_key(description))
+        if hit is None or self._merchants() is None:
+            return hit
+        k, v = hit
+        if isinstance(v, dict):
+            return {"description": k, "category": v.get("category",""), "group": v.get("group","")}
+        return {"description": k, "category": str(v), "group": ""}
+
+    def upsert(self, description: str, category: str, group: str) -> None:
+        dk = norm_key(description)
+        merchants = self._merchants()
+        if merchants is None:
+            existing = self._by_key.get(dk)
+            if existing is None:
+                existing = {"description": description}
+                self.rules.append(existing)
+                self._by_key[dk] = existing
+            existing["category"] = category
+            existing["group"] = group
+            return
+        k, v = self._by_key.get(dk, (description, None))
+        if isinstance(v, dict):
+            v["category"] = category
+            v["group"] = group
+        else:
+            # merchant values are plain category names for the other commands
+            v = category
+        merchants[k] = v
+        self._by_key[dk] = (k, v)
+
+def load_rules(path: Path) -> RulesIndex:
     if not path.exists():
-        return []
+        return RulesIndex([])
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
+        raw = path.read_bytes()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw.decode("utf-8"))
     except Exception:
-        return []
+        return RulesIndex([])
+    if not isinstance(data, (list, dict)):
+        return RulesIndex([])
+    return RulesIndex(data)
+
+def dump_rules(rules: RulesIndex) -> bytes:
+    """UTF-8 rules.json bytes; orjson's 2-space indent matches json.dumps(indent=2, ensure_ascii=False)."""
+    if orjson is not None:
+        return orjson.dumps(rules.rules, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS) + b"\n"
+    return (json.dumps(rules.rules, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
 
-def save_rules(path: Path, rules: List[Dict[str, Any]]) -> None:
-    path.write_text(json.dumps(rules, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+def save_rules(path: Path, rules: RulesIndex) -> None:
+    # write a temp file and rename it over rules.json, so a crash never leaves it truncated
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with tmp.open("w", encoding="utf-8", newline="") as f:
+        if orjson is not None:
+            f.buffer.write(dump_rules(rules))
+        else:
+            # stream to the file rather than building the whole document in memory
+            json.dump(rules.rules, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        f.flush()
+        os.fsync(f.fileno())
+    tmp.replace(path)
 
-def find_rule_for_description(rules: List[Dict[str, Any]], description: str) -> Optional[Dict[str, Any]]:
-    dk = norm_key(description)
-    for r in rules:
-        if norm_key(str(r.get("description",""))) == dk:
-            return r
-    return None
+def find_rule_for_description(rules: RulesIndex, description: str) -> Optional[Dict[str, Any]]:
+    return rules.find(description)
 
-def upsert_rule_literal_description(rules: List[Dict[str, Any]], description: str, category: str, group: str) -> None:
+def upsert_rule_literal_description(rules: RulesIndex, description: str, category: str, group: str) -> None:
     """Per spec: for now, copy literal description into rules.json and map to chosen category."""
-    existing = find_rule_for_description(rules, description)
-    if existing is None:
-        rules.append({"description": description, "category": category, "group": group})
-    else:
-        existing["category"] = category
-        existing["group"] = group
+    rules.upsert(description, category, group)
@@ -1,24 +1,74 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from collections import Counter
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+from .prefix_trie import PrefixTrie
 from .text_utils import norm_key, titleish
 
 DEFAULT_GROUP = "Aaa"
 DEFAULT_CATEGORY = "Uncategorized"
 
+_DEFAULT_CAT_KEY = norm_key(DEFAULT_CATEGORY)
+_DEFAULT_GRP_KEY = norm_key(DEFAULT_GROUP)
+
 @dataclass
 class Taxonomy:
     groups: List[str]                 # display names
     group_to_cats: Dict[str, List[str]]  # group display -> list of category display
+    # bumped by every mutator; derived lookups below are rebuilt lazily after each change
+    _version: int = field(default=0, init=False, repr=False, compare=False)
+    # set by mutators; finalize() runs the sort/defaults pass only when this is set
+    _dirty: bool = field(default=True, init=False, repr=False, compare=False)
+    _cat_ids: Optional[Tuple[Tuple[int, str, str], ...]] = field(default=None, init=False, repr=False, compare=False)
+    _cat_id_map: Optional[Mapping[int, Tuple[int, str, str]]] = field(default=None, init=False, repr=False, compare=False)
+    _cat_key_to_id: Optional[Mapping[str, int]] = field(default=None, init=False, repr=False, compare=False)
+    _cat_to_group: Optional[Mapping[str, str]] = field(default=None, init=False, repr=False, compare=False)
+    _cat_trie: Optional[PrefixTrie] = field(default=None, init=False, repr=False, compare=False)
+    _grp_trie: Optional[PrefixTrie] = field(default=None, init=False, repr=False, compare=False)
+    _by_group: Optional[Dict[str, List[Tuple[int, str]]]] = field(default=None, init=False, repr=False, compare=False)
+    _group_keys: Optional[FrozenSet[str]] = field(default=None, init=False, repr=False, compare=False)
+    _category_keys: Optional[FrozenSet[str]] = field(default=None, init=False, repr=False, compare=False)
+    # norm_key -> number of transactions currently using that category / group
+    _cat_refs: Counter = field(default_factory=Counter, init=False, repr=False, compare=False)
+    _grp_refs: Counter = field(default_factory=Counter, init=False, repr=False, compare=False)
+
+    def _touch(self) -> None:
+        # called by every mutator: new version, drop all derived lookups
+        self._version += 1
+        self._cat_ids = None
+        self._cat_id_map = None
+        self._cat_key_to_id = None
+        self._cat_to_group = None
+        self._cat_trie = None
+        self._grp_trie = None
+        self._by_group = None
+        self._group_keys = None
+        self._category_keys = None
+
+    def _mark_dirty(self) -> None:
+        self._touch()
+        self._dirty = True
+
+    @property
+    def version(self) -> int:
+        """Changes whenever groups or categories are mutated; use as a cache key."""
+        return self._version
 
     def ensure_defaults(self) -> None:
+        if not self._dirty:
+            return  # the last finalize() already ensured them
+        self._touch()
+        self._ensure_defaults()
+
+    def _ensure_defaults(self) -> None:
         gk = {norm_key(g): g for g in self.groups}
-        if norm_key(DEFAULT_GROUP) not in gk:
+        if _DEFAULT_GRP_KEY not in gk:
             self.groups.insert(0, DEFAULT_GROUP)
             self.group_to_cats[DEFAULT_GROUP] = [DEFAULT_CATEGORY]
         else:
-            gname = gk[norm_key(DEFAULT_GROUP)]
+            gname = gk[_DEFAULT_GRP_KEY]
             self.groups[self.groups.index(gname)] = DEFAULT_GROUP
             self.group_to_cats[DEFAULT_GROUP] = self.group_to_cats.pop(gname)
         # ensure default category exists and is the only category in Aaa
@@ -26,23 +76,24 @@ class Taxonomy:
 
     def normalize_display(self) -> None:
         # normalize capitalization for professional display
+        self._mark_dirty()
         new_groups: List[str] = []
         new_map: Dict[str, List[str]] = {}
         for g in self.groups:
             g2 = titleish(g)
-            if norm_key(g2) == norm_key(DEFAULT_GROUP):
+            if norm_key(g2) == _DEFAULT_GRP_KEY:
                 g2 = DEFAULT_GROUP
             new_groups.append(g2)
         # map old->new group keys
         old_to_new = {norm_key(old): new for old, new in zip(self.groups, new_groups)}
         for old_g, cats in self.group_to_cats.items():
             ng = old_to_new.get(norm_key(old_g), titleish(old_g))
-            if norm_key(ng) == norm_key(DEFAULT_GROUP):
+            if norm_key(ng) == _DEFAULT_GRP_KEY:
                 ng = DEFAULT_GROUP
             new_map.setdefault(ng, [])
             for c in cats:
                 c2 = titleish(c)
-                if norm_key(c2) == norm_key(DEFAULT_CATEGORY):
+                if norm_key(c2) == _DEFAULT_CAT_KEY:
                     c2 = DEFAULT_CATEGORY
                 new_map[ng].append(c2)
         self.groups = new_groups
@@ -54,106 +105,219 @@ class Taxonomy:
         for g, cats in self.group_to_cats.items():
             for c in cats:
                 k = norm_key(c)
-                if k in seen and k != norm_key(DEFAULT_CATEGORY):
+                if k in seen and k != _DEFAULT_CAT_KEY:
                     raise ValueError(f"Category name must be unique across groups: '{c}' duplicates '{seen[k]}'")
                 seen[k] = c
 
     def sort_alpha(self) -> None:
         # Aaa first, then alpha
-        rest = [g for g in self.groups if norm_key(g) != norm_key(DEFAULT_GROUP)]
+        self.finalize()
+
+    def finalize(self) -> None:
+        """Sort (Aaa first, then alpha), drop stray Uncategorized/duplicate entries and ensure the defaults.
+        Mutators only mark the taxonomy dirty; this does the work once, and is a no-op when clean.
+        Every derived lookup calls it first.
+        """
+        if not self._dirty:
+            return
+        rest = [g for g in self.groups if norm_key(g) != _DEFAULT_GRP_KEY]
         rest.sort(key=lambda s: norm_key(s))
         self.groups = [DEFAULT_GROUP] + rest
         for g in list(self.group_to_cats.keys()):
-            if norm_key(g) != norm_key(DEFAULT_GROUP):
-                cats = self.group_to_cats[g]
-                # remove any accidental Uncategorized duplicates
-                cats = [c for c in cats if norm_key(c) != norm_key(DEFAULT_CATEGORY)]
+            if norm_key(g) != _DEFAULT_GRP_KEY:
+                # drop stray Uncategorized entries and case-insensitive duplicates (first wins)
+                seen = set()
+                cats = [
+                    c for c in self.group_to_cats[g]
+                    if (k := norm_key(c)) != _DEFAULT_CAT_KEY and not (k in seen or seen.add(k))
+                ]
                 cats.sort(key=lambda s: norm_key(s))
                 self.group_to_cats[g] = cats
-        self.ensure_defaults()
+        self._ensure_defaults()
+        # the key sets may have been built from the unfinalized lists
+        self._group_keys = None
+        self._category_keys = None
+        self._dirty = False
 
     def add_category(self, category: str, group: str) -> None:
         category = titleish(category)
-        group = DEFAULT_GROUP if norm_key(group) == norm_key(DEFAULT_GROUP) else titleish(group)
+        group = DEFAULT_GROUP if norm_key(group) == _DEFAULT_GRP_KEY else titleish(group)
         if not category:
             return
-        if norm_key(category) == norm_key(DEFAULT_CATEGORY):
+        if norm_key(category) == _DEFAULT_CAT_KEY:
+            return
+        if group == DEFAULT_GROUP:
+            # Aaa only ever holds Uncategorized; finalize() would discard the category, and
+            # until then it would shadow the real group the caller attaches it to next
             return
         # ensure group exists
         if group not in self.group_to_cats:
             self.add_group(group)
         # enforce uniqueness across all groups
-        for g, cats in self.group_to_cats.items():
-            for c in cats:
-                if norm_key(c) == norm_key(category):
-                    return  # already exists somewhere
+        if norm_key(category) in self._category_key_set():
+            return  # already exists somewhere
+        self._mark_dirty()
         self.group_to_cats[group].append(category)
-        self.sort_alpha()
-        self.validate_unique_categories()
 
     def add_group(self, group: str) -> None:
         group = titleish(group)
         if not group:
             return
-        if norm_key(group) == norm_key(DEFAULT_GROUP):
+        if norm_key(group) == _DEFAULT_GRP_KEY:
             return
-        if norm_key(group) in {norm_key(g) for g in self.groups}:
+        if norm_key(group) in self._group_key_set():
             # already exists (case-insensitive); do nothing
             return
+        self._mark_dirty()
         self.groups.append(group)
         self.group_to_cats[group] = []
-        self.sort_alpha()
 
-    def remove_category_if_unused(self, category: str, used_categories: List[str]) -> None:
+    def _group_key_set(self) -> FrozenSet[str]:
+        # norm_key of every group, for O(1) existence checks; cached per version
+        if self._group_keys is None:
+            self._group_keys = frozenset(norm_key(g) for g in self.groups)
+        return self._group_keys
+
+    def _category_key_set(self) -> FrozenSet[str]:
+        # norm_key of every category in any group; cached per version
+        if self._category_keys is None:
+            self._category_keys = frozenset(norm_key(c) for cats in self.group_to_cats.values() for c in cats)
+        return self._category_keys
+
+    def reset_usage(self, categories: Iterable[str], groups: Iterable[str]) -> None:
+        """Seed the per-name usage counts from every transaction's category and group."""
+        self._cat_refs = Counter(norm_key(c) for c in categories if c)
+        self._grp_refs = Counter(norm_key(g) for g in groups if g)
+
+    def retain_usage(self, category: str, group: str) -> None:
+        if category:
+            self._cat_refs[norm_key(category)] += 1
+        if group:
+            self._grp_refs[norm_key(group)] += 1
+
+    def release_usage(self, category: str, group: str) -> None:
+        if category:
+            self._cat_refs[norm_key(category)] -= 1
+        if group:
+            self._grp_refs[norm_key(group)] -= 1
+
+    def remove_category_if_unused(self, category: str, used_categories: Optional[List[str]] = None) -> None:
+        """Drop category unless it is in use: per used_categories if given, else per the usage counts."""
         k = norm_key(category)
-        if k in {norm_key(DEFAULT_CATEGORY)}:
+        if k == _DEFAULT_CAT_KEY:
             return
-        if k in {norm_key(u) for u in used_categories if u}:
+        if used_categories is None:
+            if self._cat_refs[k] > 0:
+                return
+        elif k in {norm_key(u) for u in used_categories if u}:
             return
+        self._mark_dirty()
         # remove from its group
         for g in list(self.group_to_cats.keys()):
             self.group_to_cats[g] = [c for c in self.group_to_cats[g] if norm_key(c) != k]
-        self.sort_alpha()
 
-    def remove_group_if_unused(self, group: str, used_groups: List[str]) -> None:
+    def remove_group_if_unused(self, group: str, used_groups: Optional[List[str]] = None) -> None:
+        """Drop group (and its categories) unless in use; see remove_category_if_unused.
+        With the usage counts, a group is also kept while any of its categories is still in use.
+        """
         kg = norm_key(group)
-        if kg == norm_key(DEFAULT_GROUP):
+        if kg == _DEFAULT_GRP_KEY:
             return
-        if kg in {norm_key(u) for u in used_groups if u}:
+        if used_groups is None:
+            if self._grp_refs[kg] > 0:
+                return
+            for g, cats in self.group_to_cats.items():
+                if norm_key(g) == kg and any(self._cat_refs[norm_key(c)] > 0 for c in cats):
+                    return
+        elif kg in {norm_key(u) for u in used_groups if u}:
             return
+        self._mark_dirty()
         # remove group
         self.groups = [g for g in self.groups if norm_key(g) != kg]
         # also remove its cats
         for g in list(self.group_to_cats.keys()):
             if norm_key(g) == kg:
                 self.group_to_cats.pop(g, None)
-        self.sort_alpha()
 
-    def category_to_group(self) -> dict:
-        m = {}
-        for g, cats in self.group_to_cats.items():
-            for c in cats:
-                if norm_key(c) == norm_key(DEFAULT_CATEGORY):
-                    continue
-                m[norm_key(c)] = g
-        return m
+    def category_to_group(self) -> Mapping[str, str]:
+        """Return norm_key(category) -> group display name.
+        Cached per version; the returned read-only mapping is shared by all callers.
+        """
+        self.finalize()
+        if self._cat_to_group is None:
+            m = {}
+            for g, cats in self.group_to_cats.items():
+                for c in cats:
+                    k = norm_key(c)
+                    if k != _DEFAULT_CAT_KEY:
+                        m[k] = g
+            self._cat_to_group = MappingProxyType(m)
+        return self._cat_to_group
+
+    @property
+    def grp_by_cat_key(self) -> Mapping[str, str]:
+        """norm_key(category) -> group display name; same cached mapping as category_to_group()."""
+        return self.category_to_group()
 
-    def compute_cat_ids(self) -> List[Tuple[int, str, str]]:
-        """Return list of (cat_id, category, group) recomputed each time.
+    def compute_cat_ids(self) -> Tuple[Tuple[int, str, str], ...]:
+        """Return (cat_id, category, group) tuples, rebuilt only when the taxonomy changes.
         IDs are UI-only helpers per spec; stored files use names only.
         CatID=1 reserved for Uncategorized in Aaa.
         """
+        self.finalize()
+        if self._cat_ids is not None:
+            return self._cat_ids
         items: List[Tuple[int, str, str]] = []
         items.append((1, DEFAULT_CATEGORY, DEFAULT_GROUP))
         cid = 2
         # group order is self.groups
         for g in self.groups:
-            if norm_key(g) == norm_key(DEFAULT_GROUP):
+            if norm_key(g) == _DEFAULT_GRP_KEY:
                 continue
             cats = self.group_to_cats.get(g, [])
             for c in cats:
-                if norm_key(c) == norm_key(DEFAULT_CATEGORY):
+                if norm_key(c) == _DEFAULT_CAT_KEY:
                     continue
                 items.append((cid, c, g))
                 cid += 1
-        return items
+        self._cat_ids = tuple(items)
+        return self._cat_ids
+
+    def compute_cat_id_map(self) -> Mapping[int, Tuple[int, str, str]]:
+        """Return cat_id -> (cat_id, category, group); cached per version."""
+        if self._cat_id_map is None:
+            self._cat_id_map = MappingProxyType({item[0]: item for item in self.compute_cat_ids()})
+        return self._cat_id_map
+
+    @property
+    def cat_id_by_key(self) -> Mapping[str, int]:
+        """norm_key(category) -> cat_id (Uncategorized is 1); cached per version."""
+        if self._cat_key_to_id is None:
+            self._cat_key_to_id = MappingProxyType({norm_key(c): cid for cid, c, _ in self.compute_cat_ids()})
+        return self._cat_key_to_id
+
+    def category_trie(self) -> PrefixTrie:
+        """Prefix trie of norm_key(category) -> category, excluding Uncategorized; cached per version."""
+        if self._cat_trie is None:
+            trie = PrefixTrie(
+                (norm_key(c), c) for _, c, _ in self.compute_cat_ids()
+                if norm_key(c) != _DEFAULT_CAT_KEY
+            )
+            self._cat_trie = trie
+        return self._cat_trie
+
+    def group_trie(self) -> PrefixTrie:
+        """Prefix trie of norm_key(group) -> group; cached per version."""
+        self.finalize()
+        if self._grp_trie is None:
+            self._grp_trie = PrefixTrie((norm_key(g), g) for g in self.groups)
+        return self._grp_trie
+
+    def cat_ids_by_group(self) -> Dict[str, List[Tuple[int, str]]]:
+        """Return norm_key(group) -> [(cat_id, category), ...] in CatID order; cached per version."""
+        if self._by_group is None:
+            by_group: Dict[str, List[Tuple[int, str]]] = {}
+            for cid, c, g in self.compute_cat_ids():
+                by_group.setdefault(norm_key(g), []).append((cid, c))
+            self._by_group = by_group
+        return self._by_group
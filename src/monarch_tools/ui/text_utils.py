@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import re
+from functools import lru_cache
 
+@lru_cache(maxsize=4096)
 def titleish(s: str) -> str:
     """Capitalize first letter of each word, but keep standalone 'a' lowercase unless it's the first word.
     Implements the spec's display normalization rule.
@@ -9,21 +11,38 @@ def titleish(s: str) -> str:
     s = (s or "").strip()
     if not s:
         return s
-    words = re.split(r"(\s+)", s)
     out = []
+    n = len(s)
     first_word = True
-    for w in words:
-        if w.isspace() or w == "":
-            out.append(w)
-            continue
-        low = w.lower()
-        if low == "a" and not first_word:
-            out.append("a")
+    i = 0
+    while i < n:
+        j = i + 1
+        if s[i].isspace():
+            while j < n and s[j].isspace():
+                j += 1
+            out.append(s[i:j])
         else:
-            out.append(low[:1].upper() + low[1:])
-        if w.strip():
+            while j < n and not s[j].isspace():
+                j += 1
+            # lowercase whole words: str.lower() is context-sensitive (final sigma)
+            low = s[i:j].lower()
+            if low == "a" and not first_word:
+                out.append("a")
+            else:
+                out.append(low[:1].upper() + low[1:])
             first_word = False
+        i = j
     return "".join(out)
 
+_WS_RE = re.compile(r"\s+")
+
+@lru_cache(maxsize=8192)
 def norm_key(s: str) -> str:
-    return re.sub(r"\s+", " ", (s or "").strip().lower())
+    """Case/whitespace-insensitive comparison key.
+    Pure and called on the same category/group names and descriptions over and over, so memoized.
+    """
+    k = (s or "").strip().lower()
+    # only single ASCII spaces (isprintable() rejects every other whitespace): nothing to collapse
+    if "  " not in k and k.isprintable():
+        return k
+    return _WS_RE.sub(" ", k)
@@ -1,13 +1,21 @@
 from __future__ import annotations
 
 import csv
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Tuple
 from .taxonomy import DEFAULT_CATEGORY, DEFAULT_GROUP
-from .text_utils import titleish
+from .text_utils import norm_key, titleish
 
-@dataclass
+_DEFAULT_CAT_KEY = norm_key(DEFAULT_CATEGORY)
+_DEFAULT_GRP_KEY = norm_key(DEFAULT_GROUP)
+
+# Txn.status values; they double as the UI's curses colour pair numbers
+STATUS_CONFIRMED = 1   # confirmed, with a real category and group
+STATUS_READY = 2       # real category and group, not yet confirmed
+STATUS_INCOMPLETE = 3  # still Uncategorized and/or in Aaa
+
+@dataclass(slots=True)
 class Txn:
     idx: int
     statement_date: str
@@ -17,42 +25,79 @@ class Txn:
     group: str
     # UI state
     confirmed: bool = False
+    # norm_key(category) / norm_key(group), kept in sync on assignment
+    cat_key: str = field(init=False, repr=False, compare=False)
+    grp_key: str = field(init=False, repr=False, compare=False)
+    # one of the STATUS_* values, recomputed whenever category/group/confirmed change
+    status: int = field(init=False, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value) -> None:
+        object.__setattr__(self, name, value)
+        if name == "category":
+            object.__setattr__(self, "cat_key", norm_key(value))
+        elif name == "group":
+            object.__setattr__(self, "grp_key", norm_key(value))
+        elif name != "confirmed":
+            return
+        # fields are assigned in declaration order, so __init__ gets here before grp_key exists
+        cat_key = getattr(self, "cat_key", _DEFAULT_CAT_KEY)
+        grp_key = getattr(self, "grp_key", _DEFAULT_GRP_KEY)
+        if cat_key == _DEFAULT_CAT_KEY or grp_key == _DEFAULT_GRP_KEY:
+            status = STATUS_INCOMPLETE
+        elif getattr(self, "confirmed", False):
+            status = STATUS_CONFIRMED
+        else:
+            status = STATUS_READY
+        object.__setattr__(self, "status", status)
 
-def _pick_col(cols: List[str], candidates: List[str]) -> str:
-    lower = {c.lower(): c for c in cols}
+def _pick_col(lower_to_orig: Dict[str, str], candidates: Tuple[str, ...]) -> str:
+    """First candidate present in the header (case-insensitive); lower_to_orig maps lowercased names back."""
     for cand in candidates:
-        if cand.lower() in lower:
-            return lower[cand.lower()]
+        orig = lower_to_orig.get(cand.lower())
+        if orig is not None:
+            return orig
     return ""
 
-def load_transactions(csv_path: Path) -> Tuple[List[Txn], List[str], Dict[str, str]]:
-    rows: List[Dict[str, str]] = []
+def load_transactions(csv_path: Path) -> Tuple[List[Txn], List[str], Dict[str, Any]]:
+    txns: List[Txn] = []
+    # parsed rows, kept so write_transactions can preserve the other columns without re-reading
+    raw_rows: List[List[str]] = []
     with csv_path.open("r", newline="", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        if reader.fieldnames is None:
+        reader = csv.reader(f)
+        cols = next(reader, None)
+        if cols is None:
             raise ValueError("Input CSV has no header row.")
-        cols = list(reader.fieldnames)
-        col_stmt = _pick_col(cols, ["statement_date", "Statement Date", "Statement"])
-        col_txn = _pick_col(cols, ["transaction_date", "Transaction Date", "Transaction"])
-        col_desc = _pick_col(cols, ["description", "Description", "Merchant", "Payee"])
-        col_cat  = _pick_col(cols, ["category", "Category"])
-        col_grp  = _pick_col(cols, ["group", "Group"])
+        lower_to_orig = {c.lower(): c for c in cols}
+        col_stmt = _pick_col(lower_to_orig, ("statement_date", "Statement Date", "Statement"))
+        col_txn = _pick_col(lower_to_orig, ("transaction_date", "Transaction Date", "Transaction"))
+        col_desc = _pick_col(lower_to_orig, ("description", "Description", "Merchant", "Payee"))
+        col_cat  = _pick_col(lower_to_orig, ("category", "Category"))
+        col_grp  = _pick_col(lower_to_orig, ("group", "Group"))
+        # column name -> position (a repeated name resolves to its last column, as with DictReader)
+        pos = {c: i for i, c in enumerate(cols)}
+        i_stmt, i_txn, i_desc, i_cat, i_grp = (
+            pos[c] if c else None for c in (col_stmt, col_txn, col_desc, col_cat, col_grp)
+        )
+        width = len(cols)
         for r in reader:
-            rows.append(r)
-    txns: List[Txn] = []
-    for i, r in enumerate(rows, start=1):
-        stmt = r.get(col_stmt, "") if col_stmt else ""
-        tdt  = r.get(col_txn, "") if col_txn else ""
-        desc = r.get(col_desc, "") if col_desc else ""
-        cat  = r.get(col_cat, "") if col_cat else ""
-        grp  = r.get(col_grp, "") if col_grp else ""
-        cat = titleish(cat) if cat else DEFAULT_CATEGORY
-        grp = titleish(grp) if grp else DEFAULT_GROUP
-        txns.append(Txn(i, stmt, tdt, desc, cat, grp, confirmed=False))
-    meta = {"col_stmt": col_stmt, "col_txn": col_txn, "col_desc": col_desc, "col_cat": col_cat, "col_grp": col_grp}
+            if not r:
+                continue  # blank line
+            if len(r) < width:
+                r.extend([""] * (width - len(r)))
+            raw_rows.append(r)
+            stmt = r[i_stmt] if i_stmt is not None else ""
+            tdt  = r[i_txn] if i_txn is not None else ""
+            desc = r[i_desc] if i_desc is not None else ""
+            cat  = r[i_cat] if i_cat is not None else ""
+            grp  = r[i_grp] if i_grp is not None else ""
+            cat = titleish(cat) if cat else DEFAULT_CATEGORY
+            grp = titleish(grp) if grp else DEFAULT_GROUP
+            txns.append(Txn(len(raw_rows), stmt, tdt, desc, cat, grp, confirmed=False))
+    meta = {"col_stmt": col_stmt, "col_txn": col_txn, "col_desc": col_desc, "col_cat": col_cat, "col_grp": col_grp,
+            "_raw_rows": raw_rows}
     return txns, cols, meta
 
-def write_transactions(csv_path: Path, original_cols: List[str], meta: Dict[str, str], txns: List[Txn]) -> None:
+def write_transactions(csv_path: Path, original_cols: List[str], meta: Dict[str, Any], txns: List[Txn]) -> None:
     cols = list(original_cols)
     col_cat = meta.get("col_cat") or "Category"
     col_grp = meta.get("col_grp") or "Group"
@@ -60,19 +105,27 @@ def write_transactions(csv_path: Path, original_cols: List[str], meta: Dict[str,
         cols.append(col_cat)
     if col_grp not in cols:
         cols.append(col_grp)
+    i_cat = cols.index(col_cat)
+    i_grp = cols.index(col_grp)
 
-    # We re-read original file to preserve other columns
-    with csv_path.open("r", newline="", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        rows = list(reader)
+    rows = meta.get("_raw_rows")
+    if rows is None:
+        # not from load_transactions: re-read the original file to preserve other columns
+        with csv_path.open("r", newline="", encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            rows = [r for r in reader if r]
 
-    for i, (row, txn) in enumerate(zip(rows, txns)):
-        row[col_cat] = txn.category
-        row[col_grp] = txn.group
+    width = len(cols)
+    for row, txn in zip(rows, txns):
+        if len(row) < width:
+            row.extend([""] * (width - len(row)))
+        row[i_cat] = txn.category
+        row[i_grp] = txn.group
 
     tmp = csv_path.with_suffix(csv_path.suffix + ".tmp")
     with tmp.open("w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=cols)
-        writer.writeheader()
+        writer = csv.writer(f)
+        writer.writerow(cols)
         writer.writerows(rows)
     tmp.replace(csv_path)
@@ -19,19 +19,33 @@ from __future__ import annotations
 
 import argparse
 import re
+from bisect import bisect_left
 import unicodedata
-from dataclasses import dataclass
-from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+try:  # optional: JIT-compiled fuzzy distance for large catalogs
+    import numba
+    import numpy as np
+except ImportError:
+    numba = None
+    np = None
 
 
 # ----------------------------
 # Normalization
 # ----------------------------
 
-_PUNCT_TO_SPACE_RE = re.compile(r"[\/\-\.,'()\[\]{}:;!?\"`~|\\]+")
+# Every punctuation char the normalizer treats as a word break, mapped to a space
+_PUNCT_TRANS = str.maketrans({ch: " " for ch in "/-.,'()[]{}:;!?\"`~|\\"})
+_WS_RE = re.compile(r"\s+")
+_NONSLUG_RE = re.compile(r"[^a-z0-9\-]+")
+_DUPDASH_RE = re.compile(r"-{2,}")
 
 def _strip_diacritics(s: str) -> str:
-    # NFKD splits accents into combining marks; remove them.
+    # NFKD splits accents into combining marks; remove them. ASCII has neither.
+    if s.isascii():
+        return s
     return "".join(ch for ch in unicodedata.normalize("NFKD", s) if not unicodedata.combining(ch))
 
 def normalize(s: str) -> str:
@@ -44,12 +58,8 @@ def normalize(s: str) -> str:
       5) collapse whitespace
       6) trim
     """
-    s = _strip_diacritics(s)
-    s = s.lower()
-    s = s.replace("&", " and ")
-    s = _PUNCT_TO_SPACE_RE.sub(" ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
+    s = _strip_diacritics(s).lower().replace("&", " and ").translate(_PUNCT_TRANS)
+    return _WS_RE.sub(" ", s).strip()
 
 
 # ----------------------------
@@ -59,9 +69,9 @@ def normalize(s: str) -> str:
 def slugify(label: str) -> str:
     # stable-ish slug
     s = normalize(label)
-    s = re.sub(r"\s+", "-", s)
-    s = re.sub(r"[^a-z0-9\-]+", "", s)
-    s = re.sub(r"-{2,}", "-", s).strip("-")
+    s = _WS_RE.sub("-", s)
+    s = _NONSLUG_RE.sub("", s)
+    s = _DUPDASH_RE.sub("-", s).strip("-")
     return s or "item"
 
 def is_subsequence(query_compact: str, target_norm: str) -> bool:
@@ -80,6 +90,15 @@ def is_subsequence(query_compact: str, target_norm: str) -> bool:
             return False
     return True
 
+def char_bitmap(s: str) -> int:
+    """64-bit mask of the chars in s (spaces ignored), folded by ord(c) & 63.
+    If a query's mask isn't a subset of a target's, the query can't be a subsequence of it.
+    """
+    bits = 0
+    for c in s.replace(" ", ""):
+        bits |= 1 << (ord(c) & 63)
+    return bits
+
 def damerau_levenshtein(a: str, b: str, max_dist: Optional[int] = None) -> int:
     """
     Optimal String Alignment distance (Damerau-Levenshtein variant).
@@ -98,39 +117,97 @@ def damerau_levenshtein(a: str, b: str, max_dist: Optional[int] = None) -> int:
     if max_dist is not None and abs(la - lb) > max_dist:
         return max_dist + 1
 
-    # DP matrix
-    dp = [[0] * (lb + 1) for _ in range(la + 1)]
-    for i in range(la + 1):
-        dp[i][0] = i
-    for j in range(lb + 1):
-        dp[0][j] = j
+    # Rolling DP rows: prev2 = row i-2 (transpositions), prev = row i-1, curr = row i.
+    # Characters are compared as code points.
+    bc = [ord(ch) for ch in b]
+    prev2 = [0] * (lb + 1)
+    prev = list(range(lb + 1))
+    curr = [0] * (lb + 1)
+    a_prev = -1  # no code point matches, so row 1 never transposes
 
     for i in range(1, la + 1):
-        row_min = None
-        ai = a[i - 1]
+        ai = ord(a[i - 1])
+        curr[0] = i
+        row_min = lb + la  # above any real distance
         for j in range(1, lb + 1):
-            cost = 0 if ai == b[j - 1] else 1
-            dp[i][j] = min(
-                dp[i - 1][j] + 1,      # deletion
-                dp[i][j - 1] + 1,      # insertion
-                dp[i - 1][j - 1] + cost  # substitution
+            bj = bc[j - 1]
+            cost = 0 if ai == bj else 1
+            d = min(
+                prev[j] + 1,         # deletion
+                curr[j - 1] + 1,     # insertion
+                prev[j - 1] + cost   # substitution
             )
             # transposition
-            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
-                dp[i][j] = min(dp[i][j], dp[i - 2][j - 2] + 1)
+            if j > 1 and ai == bc[j - 2] and a_prev == bj:
+                d = min(d, prev2[j - 2] + 1)
+            curr[j] = d
+            if d < row_min:
+                row_min = d
 
-            row_min = dp[i][j] if row_min is None else min(row_min, dp[i][j])
-
-        if max_dist is not None and row_min is not None and row_min > max_dist:
+        if max_dist is not None and row_min > max_dist:
             return max_dist + 1
-
-    return dp[la][lb]
+        prev2, prev, curr = prev, curr, prev2
+        a_prev = ai
+
+    return prev[lb]
+
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _damerau_levenshtein_numba(a_codes, b_codes, max_dist):
+        """damerau_levenshtein over int32 code-point arrays; max_dist < 0 means no bound."""
+        la = a_codes.shape[0]
+        lb = b_codes.shape[0]
+        if la == 0:
+            return lb
+        if lb == 0:
+            return la
+        if max_dist >= 0 and abs(la - lb) > max_dist:
+            return max_dist + 1
+        prev2 = np.zeros(lb + 1, np.int32)
+        prev = np.arange(lb + 1).astype(np.int32)
+        curr = np.zeros(lb + 1, np.int32)
+        a_prev = -1
+        for i in range(1, la + 1):
+            ai = a_codes[i - 1]
+            curr[0] = i
+            row_min = la + lb
+            for j in range(1, lb + 1):
+                bj = b_codes[j - 1]
+                cost = 0 if ai == bj else 1
+                d = min(prev[j] + 1, curr[j - 1] + 1, prev[j - 1] + cost)
+                if j > 1 and ai == b_codes[j - 2] and a_prev == bj:
+                    d = min(d, prev2[j - 2] + 1)
+                curr[j] = d
+                if d < row_min:
+                    row_min = d
+            if max_dist >= 0 and row_min > max_dist:
+                return max_dist + 1
+            prev2, prev, curr = prev, curr, prev2
+            a_prev = ai
+        return prev[lb]
+
+def _code_points(s: str) -> Any:
+    """int32 array of s's code points for the numba path (numba must be available)."""
+    return np.array([ord(ch) for ch in s], dtype=np.int32)
 
 
 # ----------------------------
 # Data model
 # ----------------------------
 
+def token_prefixes(tokens: Iterable[str]) -> FrozenSet[str]:
+    """Every non-empty prefix of every token, for O(1) token-prefix checks."""
+    return frozenset(tok[:k] for tok in tokens for k in range(1, len(tok) + 1))
+
+def first_char_index(tokens: Sequence[str]) -> Dict[str, Tuple[int, ...]]:
+    """First character -> ascending positions of the tokens starting with it."""
+    idx: Dict[str, List[int]] = {}
+    for j, tok in enumerate(tokens):
+        if tok:
+            idx.setdefault(tok[0], []).append(j)
+    return {ch: tuple(pos) for ch, pos in idx.items()}
+
 @dataclass(frozen=True)
 class CategoryItem:
     id: str
@@ -138,6 +215,31 @@ class CategoryItem:
     norm: str
     tokens: Tuple[str, ...]
     aliases: Tuple[str, ...] = ()
+    # derived from tokens / aliases once, so search() never re-normalizes
+    token_set: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    token_prefix_set: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    token_first_chars: Dict[str, Tuple[int, ...]] = field(init=False, repr=False, compare=False)
+    alias_norms: Tuple[str, ...] = field(init=False, repr=False, compare=False)
+    alias_tokens_list: Tuple[Tuple[str, ...], ...] = field(init=False, repr=False, compare=False)
+    alias_token_sets: Tuple[FrozenSet[str], ...] = field(init=False, repr=False, compare=False)
+    alias_prefix_sets: Tuple[FrozenSet[str], ...] = field(init=False, repr=False, compare=False)
+    alias_first_chars: Tuple[Dict[str, Tuple[int, ...]], ...] = field(init=False, repr=False, compare=False)
+    char_bitmap: int = field(init=False, repr=False, compare=False)
+    alias_char_bitmaps: Tuple[int, ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "token_set", frozenset(self.tokens))
+        object.__setattr__(self, "token_prefix_set", token_prefixes(self.tokens))
+        object.__setattr__(self, "token_first_chars", first_char_index(self.tokens))
+        object.__setattr__(self, "char_bitmap", char_bitmap(self.norm))
+        alias_norms = tuple(normalize(a) for a in self.aliases)
+        alias_tokens = tuple(tuple(n.split()) for n in alias_norms)
+        object.__setattr__(self, "alias_norms", alias_norms)
+        object.__setattr__(self, "alias_tokens_list", alias_tokens)
+        object.__setattr__(self, "alias_token_sets", tuple(frozenset(t) for t in alias_tokens))
+        object.__setattr__(self, "alias_prefix_sets", tuple(token_prefixes(t) for t in alias_tokens))
+        object.__setattr__(self, "alias_first_chars", tuple(first_char_index(t) for t in alias_tokens))
+        object.__setattr__(self, "alias_char_bitmaps", tuple(char_bitmap(n) for n in alias_norms))
 
     @staticmethod
     def from_label(label: str, aliases: Optional[Sequence[str]] = None) -> "CategoryItem":
@@ -176,6 +278,11 @@ class CategoryAutocomplete:
         self.prefix_cap = max(1, prefix_cap)
         self.fuzzy_max_dist = max(0, fuzzy_max_dist)
 
+        # Code points of each item's norm, for the numba fuzzy path (None without numba)
+        self._norm_codes: Optional[List[Any]] = None
+        if numba is not None:
+            self._norm_codes = [_code_points(it.norm) for it in self.items]
+
         # Optional prefix index: prefix -> set(item_index)
         self._prefix_index: Dict[str, Set[int]] = {}
         if enable_index:
@@ -187,14 +294,15 @@ class CategoryAutocomplete:
             for tok in it.tokens:
                 # index prefixes up to cap
                 for k in range(1, min(len(tok), self.prefix_cap) + 1):
-                    p = tok[:k]
-                    idx.setdefault(p, set()).add(i)
+                    idx.setdefault(tok[:k], set()).add(i)
         self._prefix_index = idx
 
-    def _candidate_indices(self, q_tokens: List[str]) -> Set[int]:
+    def _candidate_indices(self, q_tokens: List[str]) -> Iterable[int]:
+        """Ascending indexes of the items worth scoring."""
         if not q_tokens or not self._prefix_index:
-            return set(range(len(self.items)))
+            return range(len(self.items))
 
+        # sparse sets: dense per-prefix bitsets cost O(items) to build and OR for every prefix
         cand: Set[int] = set()
         for qt in q_tokens:
             qt = qt[: self.prefix_cap]
@@ -205,7 +313,9 @@ class CategoryAutocomplete:
                 cand |= hit
 
         # If index yields nothing, fall back to full scan (still cheap for small lists)
-        return cand or set(range(len(self.items)))
+        if not cand:
+            return range(len(self.items))
+        return sorted(cand)
 
     # --- Scoring components (tunable) ---
     EXACT_MATCH = 1000
@@ -221,10 +331,20 @@ class CategoryAutocomplete:
         q_tokens: List[str],
         q_compact: str,
         target_norm: str,
-        target_tokens: Tuple[str, ...]
+        target_tokens: Tuple[str, ...],
+        q_codes: Any = None,
+        target_codes: Any = None,
+        target_token_set: Optional[FrozenSet[str]] = None,
+        target_prefix_set: Optional[FrozenSet[str]] = None,
+        target_first_chars: Optional[Dict[str, Tuple[int, ...]]] = None,
+        q_bits: int = 0,
+        target_bits: Optional[int] = None
     ) -> Tuple[float, int, bool, bool]:
         """
         Score query vs a target string (label or alias).
+        q_codes/target_codes are code-point arrays enabling the numba fuzzy path.
+        target_token_set/target_prefix_set/target_first_chars are derived from target_tokens when not given.
+        q_bits/target_bits are char_bitmap() masks; when given they reject impossible subsequences early.
         Returns (score, prefix_coverage, had_any_match, used_fuzzy)
         """
         score = 0.0
@@ -251,41 +371,55 @@ class CategoryAutocomplete:
 
         # Token-prefix + whole-word
         # For each query token, see if it matches any target token prefix.
+        if target_token_set is None:
+            target_token_set = frozenset(target_tokens)
+        if target_prefix_set is None:
+            target_prefix_set = token_prefixes(target_tokens)
+        n_q = 0
         for qt in q_tokens:
             best_for_token = 0
             if not qt:
                 continue
-            for tt in target_tokens:
-                if tt.startswith(qt):
-                    best_for_token = max(best_for_token, self.TOKEN_PREFIX)
-                    had_any_match = True
-                if tt == qt:
-                    best_for_token = max(best_for_token, self.WHOLE_WORD)
-                    had_any_match = True
+            n_q += 1
+            if qt in target_prefix_set:
+                best_for_token = self.TOKEN_PREFIX
+                had_any_match = True
+            if qt in target_token_set:
+                best_for_token = max(best_for_token, self.WHOLE_WORD)
+                had_any_match = True
             if best_for_token > 0:
                 score += best_for_token
                 prefix_coverage += 1
 
-        # Tokens in order (not necessarily adjacent)
-        if q_tokens:
+        # Tokens in order (not necessarily adjacent); impossible unless every token matched above
+        if q_tokens and prefix_coverage == n_q:
+            if target_first_chars is None:
+                target_first_chars = first_char_index(target_tokens)
             pos = 0
             ok = True
             for qt in q_tokens:
-                found = False
-                for j in range(pos, len(target_tokens)):
-                    if target_tokens[j].startswith(qt):
-                        found = True
-                        pos = j + 1
+                if not qt:
+                    # "" is a prefix of whatever token comes next
+                    if pos >= len(target_tokens):
+                        ok = False
                         break
-                if not found:
+                    pos += 1
+                    continue
+                # only tokens sharing qt's first char can start with qt; jump to the first one at/after pos
+                bucket = target_first_chars.get(qt[0], ())
+                k = bisect_left(bucket, pos)
+                j = next((j for j in bucket[k:] if target_tokens[j].startswith(qt)), -1)
+                if j < 0:
                     ok = False
                     break
+                pos = j + 1
             if ok:
                 score += self.TOKENS_IN_ORDER
                 had_any_match = True
 
         # Subsequence (cheap “gse” style)
-        if q_compact and is_subsequence(q_compact, target_norm):
+        if q_compact and (target_bits is None or q_bits & target_bits == q_bits) \
+                and is_subsequence(q_compact, target_norm):
             # Light boost (kept small so it doesn't dominate good token matches)
             score += 20
             had_any_match = True
@@ -293,7 +427,10 @@ class CategoryAutocomplete:
         # Fuzzy fallback (only if we haven't matched enough)
         # Use a conservative threshold and run on compact-ish strings.
         if not had_any_match and self.fuzzy_max_dist > 0:
-            dist = damerau_levenshtein(q_norm, target_norm, max_dist=self.fuzzy_max_dist)
+            if q_codes is not None and target_codes is not None:
+                dist = int(_damerau_levenshtein_numba(q_codes, target_codes, self.fuzzy_max_dist))
+            else:
+                dist = damerau_levenshtein(q_norm, target_norm, max_dist=self.fuzzy_max_dist)
             if dist <= self.fuzzy_max_dist:
                 used_fuzzy = True
                 had_any_match = True
@@ -308,6 +445,7 @@ class CategoryAutocomplete:
         q_norm = normalize(query)
         q_tokens = q_norm.split() if q_norm else []
         q_compact = q_norm.replace(" ", "")
+        q_bits = char_bitmap(q_compact)
 
         # Empty query: return top-ish (alphabetical, stable)
         if not q_norm:
@@ -318,6 +456,7 @@ class CategoryAutocomplete:
             ]
 
         cand_idx = self._candidate_indices(q_tokens)
+        q_codes = _code_points(q_norm) if self._norm_codes is not None else None
 
         results: List[MatchResult] = []
         for i in cand_idx:
@@ -325,15 +464,21 @@ class CategoryAutocomplete:
 
             # Score against label
             best_score, best_cov, matched, _ = self._score_one_string(
-                q_norm, q_tokens, q_compact, it.norm, it.tokens
+                q_norm, q_tokens, q_compact, it.norm, it.tokens,
+                q_codes, self._norm_codes[i] if self._norm_codes is not None else None,
+                it.token_set, it.token_prefix_set, it.token_first_chars,
+                q_bits, it.char_bitmap
             )
 
             # Score against aliases (if any) with slightly lower base weight
-            for alias in it.aliases:
-                alias_norm = normalize(alias)
-                alias_tokens = tuple(alias_norm.split())
+            for alias_norm, alias_tokens, alias_token_set, alias_prefixes, alias_first_chars, alias_bits in zip(
+                it.alias_norms, it.alias_tokens_list, it.alias_token_sets, it.alias_prefix_sets,
+                it.alias_first_chars, it.alias_char_bitmaps
+            ):
                 s2, cov2, matched2, _ = self._score_one_string(
-                    q_norm, q_tokens, q_compact, alias_norm, alias_tokens
+                    q_norm, q_tokens, q_compact, alias_norm, alias_tokens,
+                    target_token_set=alias_token_set, target_prefix_set=alias_prefixes,
+                    target_first_chars=alias_first_chars, q_bits=q_bits, target_bits=alias_bits
                 )
                 if matched2:
                     s2 -= 10  # slight penalty vs the label
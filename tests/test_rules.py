@@ -0,0 +1,37 @@
+from monarch_tools.ui.rules import RulesIndex, find_rule_for_description, upsert_rule_literal_description
+
+
+def test_list_rules_lookup_and_upsert():
+    rules = RulesIndex([
+        {"description": "SHELL OIL", "category": "Gas", "group": "Auto"},
+        {"description": "shell  oil", "category": "Other", "group": "Misc"},
+    ])
+    assert find_rule_for_description(rules, "Shell Oil")["category"] == "Gas"
+
+    upsert_rule_literal_description(rules, "shell oil", "Fuel", "Auto")
+    upsert_rule_literal_description(rules, "NETFLIX.COM", "Streaming", "Bills")
+    assert rules.rules[0] == {"description": "SHELL OIL", "category": "Fuel", "group": "Auto"}
+    assert rules.rules[-1] == {"description": "NETFLIX.COM", "category": "Streaming", "group": "Bills"}
+    assert find_rule_for_description(rules, "netflix.com")["group"] == "Bills"
+
+
+def test_merchants_rules_keep_their_shape():
+    rules = RulesIndex({"merchants": {"STARBUCKS": "Coffee"}})
+    assert find_rule_for_description(rules, "starbucks") == {
+        "description": "STARBUCKS", "category": "Coffee", "group": "",
+    }
+
+    upsert_rule_literal_description(rules, "Starbucks", "Dining", "Food")
+    upsert_rule_literal_description(rules, "SHELL", "Gas", "Auto")
+    assert rules.rules == {"merchants": {"STARBUCKS": "Dining", "SHELL": "Gas"}}
+    assert find_rule_for_description(rules, "shell")["category"] == "Gas"
+
+
+def test_flat_rules_are_updated_in_place():
+    rules = RulesIndex({"STARBUCKS": "Coffee", "SHELL": "Gas"})
+    assert find_rule_for_description(rules, "shell")["category"] == "Gas"
+    assert rules.rules == {"STARBUCKS": "Coffee", "SHELL": "Gas"}
+
+    upsert_rule_literal_description(rules, "starbucks", "Dining", "Food")
+    upsert_rule_literal_description(rules, "NETFLIX", "Streaming", "Bills")
+    assert rules.rules == {"STARBUCKS": "Dining", "SHELL": "Gas", "NETFLIX": "Streaming"}
@@ -0,0 +1,107 @@
+from monarch_tools.ui.taxonomy import DEFAULT_CATEGORY, DEFAULT_GROUP, Taxonomy
+
+
+def _taxonomy():
+    tax = Taxonomy(groups=["Food", "Auto"], group_to_cats={"Food": ["Groceries"], "Auto": ["Gas"]})
+    tax.ensure_defaults()
+    tax.sort_alpha()
+    return tax
+
+
+def test_cat_ids_order():
+    tax = _taxonomy()
+    assert list(tax.compute_cat_ids()) == [
+        (1, DEFAULT_CATEGORY, DEFAULT_GROUP),
+        (2, "Gas", "Auto"),
+        (3, "Groceries", "Food"),
+    ]
+
+
+def test_derived_lookups_are_cached_until_mutation():
+    tax = _taxonomy()
+    ids = tax.compute_cat_ids()
+    c2g = tax.category_to_group()
+    assert tax.compute_cat_ids() is ids
+    assert tax.category_to_group() is c2g
+
+    tax.add_category("Parking", "Auto")
+    assert tax.compute_cat_ids() is not ids
+    assert tax.category_to_group()["parking"] == "Auto"
+    assert [c for _, c, _ in tax.compute_cat_ids()] == [DEFAULT_CATEGORY, "Gas", "Parking", "Groceries"]
+    assert tax.compute_cat_id_map()[3] == (3, "Parking", "Auto")
+    assert tax.cat_id_by_key["groceries"] == 4
+    assert tax.cat_id_by_key["uncategorized"] == 1
+    assert tax.grp_by_cat_key is tax.category_to_group()
+
+
+def test_removal_invalidates_lookups():
+    tax = _taxonomy()
+    assert "gas" in tax.category_to_group()
+    tax.remove_category_if_unused("Gas", [])
+    assert "gas" not in tax.category_to_group()
+    assert tax.category_trie().lookup_prefix("ga") is None
+
+
+def test_prefix_lookup_prefers_alphabetically_first():
+    tax = _taxonomy()
+    tax.add_category("Gas & Electric", "Auto")
+    trie = tax.category_trie()
+    assert trie.lookup_prefix("gas") == "Gas"
+    assert trie.lookup_prefix("gas ") == "Gas & Electric"
+    assert trie.lookup_prefix("gr") == "Groceries"
+    assert trie.lookup_prefix("uncat") is None
+    assert tax.group_trie().lookup_prefix("a") == DEFAULT_GROUP
+
+
+def test_usage_counts_gate_removal():
+    tax = _taxonomy()
+    tax.reset_usage(["Gas", "Gas", "Groceries"], ["Auto", "Auto", "Food"])
+    tax.release_usage("Gas", "Auto")
+    tax.remove_category_if_unused("Gas")
+    tax.remove_group_if_unused("Auto")
+    assert "gas" in tax.category_to_group()
+    assert "Auto" in tax.groups
+
+    tax.release_usage("Gas", "Auto")
+    tax.remove_category_if_unused("Gas")
+    tax.remove_group_if_unused("Auto")
+    assert "gas" not in tax.category_to_group()
+    assert "Auto" not in tax.groups
+
+
+def test_group_with_used_categories_is_kept():
+    tax = _taxonomy()
+    # categories.txt entries all land in the first group, whatever group the rows use
+    tax.reset_usage(["Groceries"], ["Auto"])
+    tax.remove_group_if_unused("Food")
+    assert "Food" in tax.groups
+    assert tax.category_to_group()["groceries"] == "Food"
+
+
+def test_mutators_defer_sorting_to_finalize():
+    tax = _taxonomy()
+    tax.add_group("Bills")
+    tax.add_category("Rent", "Bills")
+    assert tax.groups[-1] == "Bills"  # appended, not yet sorted
+    assert [g for _, _, g in tax.compute_cat_ids()] == [DEFAULT_GROUP, "Auto", "Bills", "Food"]
+    assert tax.groups == [DEFAULT_GROUP, "Auto", "Bills", "Food"]
+
+    version = tax.version
+    tax.finalize()
+    tax.sort_alpha()
+    assert tax.version == version
+
+
+def test_new_category_moves_from_default_group():
+    tax = _taxonomy()
+    # the UI parks a new category in Aaa, then attaches it once a group is picked
+    tax.add_category("Fuel", DEFAULT_GROUP)
+    tax.add_category("Fuel", "Auto")
+    assert tax.category_to_group()["fuel"] == "Auto"
+
+
+def test_finalize_drops_duplicate_categories():
+    tax = Taxonomy(groups=["Food"], group_to_cats={"Food": ["Groceries", "uncategorized", "groceries", "Dining"]})
+    tax.ensure_defaults()
+    tax.finalize()
+    assert tax.group_to_cats["Food"] == ["Dining", "Groceries"]